@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import re
+
+# Static asset build - see 'flask assets build'.
+# Writes everything under static/dist with the content hash in each file name,
+# so a URL never changes meaning and can be cached forever:
+#
+#   icons/sprite.<hash>.png   every skill icon packed into one row of
+#                             ICON_CELL px squares (needs Pillow; skipped
+#                             without it and the icons are served one by one)
+#   css/main.<hash>.css       main.css plus the sprite rules, minified
+#   js/<name>.<hash>.js       each script, minified
+#   icons/<name>.<hash>.ext   the individual icons, for the non-sprite fallback
+#   manifest.json             source path -> built path, and icon -> sprite class
+#
+# The app loads the manifest at startup and points url_for('static', ...) at
+# the built files; without a manifest the plain files are served as before.
+#
+# A build only adds files next to the ones already there and then swaps the
+# manifest in with os.replace, so workers still running on the old manifest
+# keep finding their files.  prune() ('flask assets prune') deletes whatever
+# the current manifest no longer lists - run it once every worker has
+# restarted onto the new build.
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+ICON_CELL = 120		# px per icon in the sheet - 2x the largest size the pages draw
+
+
+def content_hash(data):
+	return hashlib.sha1(data).hexdigest()[:10]
+
+
+def minify_css(text):
+	text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+	text = re.sub(r'\s+', ' ', text)
+	text = re.sub(r'\s*([{};:,>])\s*', r'\1', text)
+	return text.replace(';}', '}').strip()
+
+
+# conservative: drops comment-only lines, indentation and blank lines, never touches code
+def minify_js(text):
+	lines = []
+	for line in text.splitlines():
+		line = line.strip()
+		if line and not line.startswith('//'):
+			lines.append(line)
+	return '\n'.join(lines) + '\n'
+
+
+def icon_class(filename):
+	return 'sprite-' + re.sub(r'[^a-zA-Z0-9_-]', '-', os.path.splitext(filename)[0])
+
+
+def write_hashed(out_dir, rel_path, data):
+	stem, ext = os.path.splitext(rel_path)
+	hashed = '%s.%s%s' % (stem, content_hash(data), ext)
+	target = os.path.join(out_dir, hashed)
+	if not os.path.isdir(os.path.dirname(target)):
+		os.makedirs(os.path.dirname(target))
+	# same name, same bytes: a file from an earlier build is left alone while it may be served
+	if not os.path.exists(target):
+		temp_path = '%s.%d.tmp' % (target, os.getpid())
+		with open(temp_path, 'wb') as out:
+			out.write(data)
+		os.replace(temp_path, target)
+	return '%s/%s' % (DIST_DIR, hashed.replace(os.sep, '/'))
+
+
+# returns (png bytes, [icon file names in sheet order]) or (None, []) without Pillow
+def pack_sprite(icons_dir, names):
+	try:
+		from PIL import Image
+	except ImportError:
+		return None, []
+	import io
+
+	sheet = Image.new('RGBA', (ICON_CELL * len(names), ICON_CELL), (0, 0, 0, 0))
+	for index, name in enumerate(names):
+		with Image.open(os.path.join(icons_dir, name)) as icon:
+			# pages draw icons as squares, so squash them the same way the <img> tags did
+			sheet.paste(icon.convert('RGBA').resize((ICON_CELL, ICON_CELL), Image.LANCZOS), (index * ICON_CELL, 0))
+	buf = io.BytesIO()
+	# a 256 colour palette keeps the sheet well under the size of the separate icons
+	sheet.quantize(256, method=Image.Quantize.FASTOCTREE).save(buf, 'PNG', optimize=True)
+	return buf.getvalue(), names
+
+
+# background-size/position in percent so one rule works at every icon size
+def sprite_css(sprite_url, names):
+	count = len(names)
+	rules = ['.icon-sprite{display:inline-block;background-image:url(%s);background-repeat:no-repeat;background-size:%d%% 100%%}' % (sprite_url, count * 100)]
+	for index, name in enumerate(names):
+		position = 100.0 * index / (count - 1) if count > 1 else 0
+		rules.append('.%s{background-position:%.4f%% 0}' % (icon_class(name), position))
+	return ''.join(rules)
+
+
+def build(static_dir, echo=print):
+	out_dir = os.path.join(static_dir, DIST_DIR)
+	if not os.path.isdir(out_dir):
+		os.makedirs(out_dir)
+	files = {}
+	icons_dir = os.path.join(static_dir, 'icons')
+	icon_names = sorted(os.listdir(icons_dir))
+
+	for name in icon_names:
+		with open(os.path.join(icons_dir, name), 'rb') as icon:
+			files['icons/' + name] = write_hashed(out_dir, os.path.join('icons', name), icon.read())
+
+	sprite_png, sprite_names = pack_sprite(icons_dir, icon_names)
+	extra_css = ''
+	if sprite_png:
+		sprite_path = files['icons/sprite.png'] = write_hashed(out_dir, os.path.join('icons', 'sprite.png'), sprite_png)
+		# relative to dist/css/
+		extra_css = sprite_css('../icons/' + os.path.basename(sprite_path), sprite_names)
+		echo("sprite: %d icons, %d bytes" % (len(sprite_names), len(sprite_png)))
+	else:
+		echo("Pillow not installed - skipping the sprite sheet, icons stay separate files")
+
+	with open(os.path.join(static_dir, 'css', 'main.css')) as source:
+		css = minify_css(source.read()) + extra_css
+	files['css/main.css'] = write_hashed(out_dir, os.path.join('css', 'main.css'), css.encode('utf-8'))
+
+	for name in sorted(os.listdir(os.path.join(static_dir, 'js'))):
+		with open(os.path.join(static_dir, 'js', name)) as source:
+			text = source.read()
+		if not name.endswith('.min.js'):
+			text = minify_js(text)
+		files['js/' + name] = write_hashed(out_dir, os.path.join('js', name), text.encode('utf-8'))
+
+	manifest = {'files': files, 'sprites': dict((name, icon_class(name)) for name in sprite_names)}
+	manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+	temp_path = '%s.%d.tmp' % (manifest_path, os.getpid())
+	with open(temp_path, 'w') as out:
+		json.dump(manifest, out, indent=2, sort_keys=True)
+	os.replace(temp_path, manifest_path)
+	echo("wrote %d files to %s" % (len(files), out_dir))
+	return manifest
+
+
+# deletes built files the current manifest does not reference; returns how many
+def prune(static_dir, echo=print):
+	out_dir = os.path.join(static_dir, DIST_DIR)
+	if not os.path.exists(os.path.join(out_dir, MANIFEST_NAME)):
+		return 0
+	keep = set(path.split('/', 1)[1] for path in load_manifest(static_dir)['files'].values())
+	removed = 0
+	for directory, dir_names, file_names in os.walk(out_dir):
+		for name in file_names:
+			rel_path = os.path.relpath(os.path.join(directory, name), out_dir).replace(os.sep, '/')
+			if rel_path != MANIFEST_NAME and rel_path not in keep:
+				os.remove(os.path.join(directory, name))
+				removed += 1
+	echo("removed %d stale files from %s" % (removed, out_dir))
+	return removed
+
+
+def load_manifest(static_dir):
+	path = os.path.join(static_dir, DIST_DIR, MANIFEST_NAME)
+	if not os.path.exists(path):
+		return {'files': {}, 'sprites': {}}
+	with open(path) as source:
+		return json.load(source)
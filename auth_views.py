@@ -0,0 +1,326 @@
+import re
+
+from flask import Blueprint, current_app, render_template, redirect, request, session, flash, Response
+
+from extensions import hasher, limiter, refdata
+from models import db, Dev, Org
+from passwords import HasherBusy
+from view_helpers import set_location, refresh_dev_facets
+
+auth = Blueprint('auth', __name__)
+
+# endpoint -> (rule, config key, bucket key) for every POST that ends in a bcrypt call
+ADMISSION_RULES = {
+	'auth.validate_login': [('login_ip', 'LOGIN_LIMIT_PER_IP', lambda: request.remote_addr), ('login_email', 'LOGIN_LIMIT_PER_EMAIL', lambda: request.form.get('email', '').strip().lower())],
+	'auth.org_validate_login': [('login_ip', 'LOGIN_LIMIT_PER_IP', lambda: request.remote_addr), ('login_email', 'LOGIN_LIMIT_PER_EMAIL', lambda: request.form.get('email', '').strip().lower())],
+	'auth.devs_signup': [('signup_ip', 'SIGNUP_LIMIT_PER_IP', lambda: request.remote_addr)],
+	'auth.orgs_signup': [('signup_ip', 'SIGNUP_LIMIT_PER_IP', lambda: request.remote_addr)],
+}
+
+# runs before the view, so a rejected attempt costs no query and no hash
+@auth.before_request
+def admission_control():
+	rules = ADMISSION_RULES.get(request.endpoint)
+	if not rules or request.method != 'POST' or not current_app.config['RATE_LIMITS_ENABLED']:
+		return None
+	# the hashing pool is already full - HasherBusy would follow after the DB lookup anyway
+	if hasher.pending >= hasher.max_pending:
+		limiter.record('password_pool', 'rejected')
+		return too_many_attempts(1)
+	for rule, limit_key, bucket_key in rules:
+		wait = limiter.take(rule, bucket_key(), *current_app.config[limit_key])
+		if wait:
+			return too_many_attempts(wait)
+	return None
+
+def too_many_attempts(wait):
+	seconds = int(wait) + 1
+	response = Response("Too many attempts. Please try again in %d seconds.\n" % seconds, status=429, mimetype='text/plain')
+	response.headers['Retry-After'] = str(seconds)
+	return response
+
+# upgrade hashes made with an older work factor while we have the plain password.
+# Best effort: when the pool is busy the login still goes through and the
+# upgrade waits for the next one.
+def upgrade_password_hash(account, password):
+	if not hasher.needs_rehash(account.password):
+		return
+	try:
+		account.password = hasher.hash(password)
+	except HasherBusy:
+		return
+	db.session.commit()
+
+
+################
+## ROOT ROUTE ##
+################
+@auth.route('/')
+def index():
+	if 'userid' in session:
+		if session['acct_type'] == "dev":
+			return redirect('/devs/dashboard')
+		else:
+			return redirect('/orgs/dashboard')
+	# Dev registration always default
+	else:
+		return redirect('/devs/register')
+
+
+#########################################
+## VALIDATE FORM DATA and REGISTER DEV ##
+#########################################
+@auth.route('/devs/signup', methods=['POST'])
+def devs_signup():
+	is_valid = True
+	EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9.+_-]+@[a-zA-Z0-9._-]+\.[a-zA-Z]+$')
+	NAME_REGEX = re.compile(r'^[a-zA-Z]+$')
+	# Password regex - uppercase, lowercase, and number required
+	PW_REGEX = re.compile(r'^(?=.*\d)(?=.*[a-z])(?=.*[A-Z])(?!.*\s).*$')
+
+	# Validate name fields
+	if len(request.form['fname']) < 2 or len(request.form['lname']) < 2:
+		flash("Both your first and last name must be at least 2 characters long.", 'reg_error')
+		is_valid = False
+	else:
+		if NAME_REGEX.match(request.form['fname']) is None or NAME_REGEX.match(request.form['lname']) is None:
+			flash("Your name can only contain letters.", 'reg_error')
+			is_valid = False
+
+	if EMAIL_REGEX.match(request.form['email']):
+		checkEmail = Dev.query.filter_by(email=request.form['email']).first()
+		if checkEmail:
+			flash("Account already exists with this Email.", 'reg_error')
+			is_valid = False
+	else:
+		flash("Email address not valid.", 'reg_error')
+		is_valid = False
+
+	# Validate Password
+	if len(request.form['password']) < 5:
+		flash("Password must be a minimum of 5 characters.", 'reg_error')
+		is_valid = False
+	elif PW_REGEX.match(request.form['password']) is None:
+		flash("Password requires at least one uppercase, one lowercase letter, and a number.", 'reg_error')
+		is_valid = False
+	else:
+		if request.form['confirm_password'] != request.form['password']:
+			flash("Passwords did not match.", 'reg_error')
+			is_valid = False
+
+	# City and State at least required for location
+	if len(request.form['addr_city']) < 2 or len(request.form['addr_state']) < 2:
+		flash("Must enter at least a City and State for your address.", 'reg_error')
+		is_valid = False
+
+	# Record data and flash success
+	if is_valid:
+		try:
+			pw_hash = hasher.hash(request.form['password'])
+		except HasherBusy:
+			flash("We're handling a lot of sign-ins right now. Please try again in a moment.", 'reg_error')
+			return redirect('/')
+
+		new_instance_of_dev = Dev(first_name=request.form['fname'], last_name=request.form['lname'], email=request.form['email'], password=pw_hash, address=request.form['addr_street'], address_2=request.form['addr_2'], address_city=request.form['addr_city'], address_state=request.form['addr_state'], status=1)		
+		set_location(new_instance_of_dev)
+		db.session.add(new_instance_of_dev)
+		db.session.commit()
+		refresh_dev_facets(new_instance_of_dev.id)
+		session['userid'] = new_instance_of_dev.id
+		session['name'] = request.form['fname'] + " " + request.form['lname']
+		session['acct_type'] = "dev"
+
+		return redirect('/devs/skills/languages')
+
+	return redirect('/')
+
+
+#########################################
+## VALIDATE FORM DATA and REGISTER ORG ##
+#########################################
+@auth.route('/orgs/signup', methods=['POST'])
+def orgs_signup():
+	is_valid = True
+	EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9.+_-]+@[a-zA-Z0-9._-]+\.[a-zA-Z]+$')
+	NAME_REGEX = re.compile(r'^[a-zA-Z\s]+$')
+	# Password regex - uppercase, lowercase, and number required
+	PW_REGEX = re.compile(r'^(?=.*\d)(?=.*[a-z])(?=.*[A-Z])(?!.*\s).*$')
+
+	# Validate Org name
+	if len(request.form['org_name']) < 2:
+		flash("Your Organization's name must be at least 2 characters long.", 'reg_error')
+		is_valid = False
+
+	# Validate Rep name
+	if len(request.form['rep_name']) < 2:
+		flash("Your Organization's name must be at least 2 characters long.", 'reg_error')
+		is_valid = False
+	else:
+		if NAME_REGEX.match(request.form['rep_name']) is None:
+			flash("Your representative's name can only contain letters.", 'reg_error')
+			is_valid = False
+
+	if EMAIL_REGEX.match(request.form['email']):
+		checkEmail = Org.query.filter_by(email=request.form['email']).first()
+		if checkEmail:
+			flash("Account already exists with this Email.", 'reg_error')
+			is_valid = False
+	else:
+		flash("Email address not valid.", 'reg_error')
+		is_valid = False
+
+	# Validate Password
+	if len(request.form['password']) < 5:
+		flash("Password must be a minimum of 5 characters.", 'reg_error')
+		is_valid = False
+	elif PW_REGEX.match(request.form['password']) is None:
+		flash("Password requires at least one uppercase, one lowercase letter, and a number.", 'reg_error')
+		is_valid = False
+	else:
+		if request.form['confirm_password'] != request.form['password']:
+			flash("Passwords did not match.", 'reg_error')
+			is_valid = False
+
+	# Full address required for organization
+	if len(request.form['addr_street']) < 5:
+		flash("Your Organization's street address does not appear valid.", 'reg_error')
+		is_valid = False
+	
+	if len(request.form['addr_city']) < 2:
+		flash("Must enter a City for your address.", 'reg_error')
+		is_valid = False
+
+	if len(request.form['addr_state']) < 2:
+		flash("Must enter a State for your address.", 'reg_error')
+		is_valid = False
+
+	# Record data and flash success
+	if is_valid:
+		try:
+			pw_hash = hasher.hash(request.form['password'])
+		except HasherBusy:
+			flash("We're handling a lot of sign-ins right now. Please try again in a moment.", 'reg_error')
+			return redirect('/orgs/register')
+
+		new_instance_of_org = Org(org_name=request.form['org_name'], rep_name=request.form['rep_name'], email=request.form['email'], password=pw_hash, address=request.form['addr_street'], address_2=request.form['addr_2'], address_city=request.form['addr_city'],address_state=request.form['addr_state'])		
+		set_location(new_instance_of_org)
+		db.session.add(new_instance_of_org)
+		db.session.commit()
+		session['userid'] = new_instance_of_org.id
+		session['name'] = request.form['org_name']
+		session['acct_type'] = "org"
+
+		return redirect('/orgs/dashboard')
+
+	return redirect('/orgs/register')
+
+
+#######################
+## DEVS REGISTRATION ##
+#######################
+@auth.route('/devs/register')
+def devs_register():
+	if 'userid' in session:
+		return redirect('/')
+
+	state_list = refdata.get().states
+	return render_template('dev_reg.html', all_states=state_list)
+
+
+#######################
+## ORGS REGISTRATION ##
+#######################
+@auth.route('/orgs/register')
+def orgs_register():
+	if 'userid' in session:
+		return redirect('/')
+
+	state_list = refdata.get().states
+	return render_template('org_reg.html', all_states=state_list)
+
+
+################
+## USER LOGIN ##
+################
+@auth.route('/devs/login')
+def login():
+	if 'userid' in session:
+		return redirect('/')
+
+	return render_template('dev_login.html')
+
+
+#########################
+## VALIDATE USER LOGIN ##
+#########################
+@auth.route('/devs/validate/login', methods=['POST'])
+def validate_login():
+	loginUser = Dev.query.filter_by(email=request.form['email']).first()
+
+	if loginUser:
+		try:
+			pw = hasher.check(loginUser.password, request.form['password'])
+		except HasherBusy:
+			flash("We're handling a lot of sign-ins right now. Please try again in a moment.", 'login_error')
+			return redirect('/devs/login')
+
+		if pw:
+			upgrade_password_hash(loginUser, request.form['password'])
+			session['userid'] = loginUser.id
+			session['name'] = loginUser.first_name + " " + loginUser.last_name
+			session['acct_type'] = "dev"
+			return redirect('/devs/dashboard')
+		else:
+			flash("Password incorrect! Please try again.", 'login_error')
+	else:
+		flash("Email not recognized", 'login_error')
+
+	return redirect('/devs/login')
+
+
+###############
+## ORG LOGIN ##
+###############
+@auth.route('/orgs/login')
+def org_login():
+	if 'userid' in session:
+		return redirect('/')
+
+	return render_template('org_login.html')
+
+
+########################
+## VALIDATE ORG LOGIN ##
+########################
+@auth.route('/orgs/validate/login', methods=['POST'])
+def org_validate_login():
+	loginOrg = Org.query.filter_by(email=request.form['email']).first()
+
+	if loginOrg:
+		try:
+			pw = hasher.check(loginOrg.password, request.form['password'])
+		except HasherBusy:
+			flash("We're handling a lot of sign-ins right now. Please try again in a moment.", 'login_error')
+			return redirect('/orgs/login')
+
+		if pw:
+			upgrade_password_hash(loginOrg, request.form['password'])
+			session['userid'] = loginOrg.id
+			session['name'] = loginOrg.org_name
+			session['acct_type'] = "org"
+			return redirect('/orgs/dashboard')
+		else:
+			flash("Password incorrect! Please try again.", 'login_error')
+	else:
+		flash("Email not recognized", 'login_error')
+
+	return redirect('/orgs/login')
+
+
+############
+## LOGOUT ##
+############
+@auth.route('/logout')
+def logout():
+	session.clear()
+	return redirect('/')
@@ -0,0 +1,71 @@
+"""Login throughput benchmark for the off-thread bcrypt hasher.
+
+Drives PasswordHasher.check() from a number of concurrent "request" threads
+for each pool size and work factor, and reports verified logins/sec overall
+and per core.
+
+    python benchmarks/bcrypt_throughput.py
+    python benchmarks/bcrypt_throughput.py --rounds 10,12 --seconds 5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_bcrypt import Bcrypt
+from passwords import PasswordHasher, HasherBusy
+
+PASSWORD = 'Passw0rd'
+
+
+def run(hasher, pw_hash, clients, seconds):
+	done = [0]
+	busy = [0]
+	lock = threading.Lock()
+	deadline = time.perf_counter() + seconds
+
+	def client():
+		while time.perf_counter() < deadline:
+			try:
+				hasher.check(pw_hash, PASSWORD)
+				with lock:
+					done[0] += 1
+			except HasherBusy:
+				with lock:
+					busy[0] += 1
+				time.sleep(0.001)
+
+	threads = [threading.Thread(target=client) for _ in range(clients)]
+	start = time.perf_counter()
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	return done[0] / (time.perf_counter() - start), busy[0]
+
+
+def main():
+	cores = os.cpu_count() or 1
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--rounds', default='12', help="comma separated bcrypt work factors")
+	parser.add_argument('--workers', default=','.join(str(n) for n in sorted(set([1, 2, cores]))), help="comma separated pool sizes")
+	parser.add_argument('--clients', type=int, default=16, help="concurrent request threads")
+	parser.add_argument('--seconds', type=float, default=3.0)
+	args = parser.parse_args()
+
+	bcrypt = Bcrypt()
+	print("%d cores, %d client threads" % (cores, args.clients))
+	print("%6s %8s %12s %16s %10s" % ('rounds', 'workers', 'logins/sec', 'logins/sec/core', 'rejected'))
+	for rounds in [int(r) for r in args.rounds.split(',')]:
+		pw_hash = bcrypt.generate_password_hash(PASSWORD, rounds)
+		for workers in [int(w) for w in args.workers.split(',')]:
+			hasher = PasswordHasher(bcrypt, rounds=rounds, max_workers=workers, max_pending=workers * 4, timeout=60.0)
+			rate, rejected = run(hasher, pw_hash, args.clients, args.seconds)
+			print("%6d %8d %12.1f %16.1f %10d" % (rounds, workers, rate, rate / min(workers, cores), rejected))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,125 @@
+"""Buffered vs streamed (and compressed) orgs dashboard: TTFB, total time, peak RSS.
+
+Each setup runs in its own server process on a seeded database (see
+'flask seed'), so peak RSS is that process's high-water mark.  The page size
+is raised well past the default so the page holds thousands of cards, and the
+card cache is cleared before every request so each one renders from scratch.
+
+    flask seed --devs 20000 --orgs 100 --positions 1000
+    python benchmarks/dashboard_streaming.py --manifest instance/seed_manifest.json --page-size 2000
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# name -> (stream pages, compress responses, Accept-Encoding sent)
+SETUPS = [
+	('buffered', False, False, None),
+	('streamed', True, False, None),
+	('streamed+gzip', True, True, 'gzip'),
+	('streamed+br', True, True, 'br'),
+]
+
+
+def serve(port, stream, compress, page_size):
+	os.chdir(ROOT)
+	from app import app
+	from extensions import fragments
+	from werkzeug.serving import make_server
+	app.config.update(STREAM_PAGES=stream, COMPRESS_RESPONSES=compress, DEVS_PAGE_SIZE=page_size)
+	app.before_request(lambda: fragments.clear())
+	make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def peak_rss_kb(pid):
+	try:
+		with open('/proc/%d/status' % pid) as status:
+			for line in status:
+				if line.startswith('VmHWM:'):
+					return int(line.split()[1])
+	except OSError:
+		pass
+	return None
+
+
+def login(port, manifest):
+	conn = http.client.HTTPConnection('127.0.0.1', port)
+	body = urlencode({'email': manifest['org_email'] % manifest['org_ids'][0], 'password': manifest['password']})
+	conn.request('POST', '/orgs/validate/login', body, {'Content-Type': 'application/x-www-form-urlencoded'})
+	response = conn.getresponse()
+	response.read()
+	return response.getheader('Set-Cookie').split(';')[0]
+
+
+def fetch(port, cookie, accept_encoding):
+	headers = {'Cookie': cookie}
+	if accept_encoding:
+		headers['Accept-Encoding'] = accept_encoding
+	conn = http.client.HTTPConnection('127.0.0.1', port)
+	start = time.perf_counter()
+	conn.request('GET', '/orgs/dashboard', headers=headers)
+	response = conn.getresponse()
+	first = response.read(1)
+	ttfb = time.perf_counter() - start
+	size = len(first) + len(response.read())
+	total = time.perf_counter() - start
+	conn.close()
+	return ttfb, total, size
+
+
+def run(name, stream, compress, accept_encoding, args, manifest, port):
+	server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', str(port), '--stream', str(int(stream)),
+		'--compress', str(int(compress)), '--page-size', str(args.page_size)], stderr=subprocess.DEVNULL)
+	try:
+		for _ in range(100):
+			try:
+				cookie = login(port, manifest)
+				break
+			except (ConnectionError, OSError):
+				time.sleep(0.1)
+		samples = [fetch(port, cookie, accept_encoding) for _ in range(args.requests)]
+		rss = peak_rss_kb(server.pid)
+	finally:
+		server.terminate()
+		server.wait()
+
+	ttfb = sorted(sample[0] for sample in samples)[len(samples) // 2]
+	total = sorted(sample[1] for sample in samples)[len(samples) // 2]
+	return ttfb, total, samples[0][2], rss
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--manifest', default=os.path.join(ROOT, 'instance', 'seed_manifest.json'))
+	parser.add_argument('--page-size', type=int, default=2000)
+	parser.add_argument('--requests', type=int, default=10)
+	parser.add_argument('--port', type=int, default=5099)
+	parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+	parser.add_argument('--stream', type=int, default=1, help=argparse.SUPPRESS)
+	parser.add_argument('--compress', type=int, default=1, help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	if args.serve:
+		serve(args.serve, bool(args.stream), bool(args.compress), args.page_size)
+		return
+
+	with open(args.manifest) as manifest_file:
+		manifest = json.load(manifest_file)
+
+	print("orgs dashboard, %d devs per page, %d requests each (median)" % (args.page_size, args.requests))
+	print("%-14s %10s %10s %12s %12s" % ('setup', 'TTFB ms', 'total ms', 'bytes', 'peak RSS MB'))
+	for offset, (name, stream, compress, accept_encoding) in enumerate(SETUPS):
+		ttfb, total, size, rss = run(name, stream, compress, accept_encoding, args, manifest, args.port + offset)
+		print("%-14s %10.1f %10.1f %12d %12s" % (name, ttfb * 1000, total * 1000, size, '%.1f' % (rss / 1024.0) if rss else 'n/a'))
+
+
+if __name__ == '__main__':
+	main()
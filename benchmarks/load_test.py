@@ -0,0 +1,185 @@
+"""Per-route load harness for a running Devs On Deck server.
+
+Reads the manifest written by 'flask seed', logs in as seeded devs and orgs,
+and drives the dashboard, profile, job and signup/login routes from a pool
+of concurrent virtual users.  Prints and saves a JSON baseline with
+throughput and p50/p95/p99 latency per route; pass --compare to diff the run
+against an earlier baseline.
+
+    flask seed --devs 100000 --orgs 10000 --positions 50000
+    RATE_LIMITS_ENABLED=0 flask run &     # every virtual user logs in from this one IP
+    python benchmarks/load_test.py --manifest instance/seed_manifest.json --output baseline.json
+    python benchmarks/load_test.py --manifest instance/seed_manifest.json --compare baseline.json
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import build_opener, HTTPCookieProcessor, HTTPRedirectHandler, Request
+
+
+# we time each request on its own, so redirects are recorded, not followed
+class NoRedirect(HTTPRedirectHandler):
+	def redirect_request(self, req, fp, code, msg, headers, newurl):
+		return None
+
+
+class VirtualUser(object):
+
+	def __init__(self, base_url, manifest, rng, record):
+		self.base_url = base_url.rstrip('/')
+		self.manifest = manifest
+		self.rng = rng
+		self.record = record
+		self.opener = build_opener(HTTPCookieProcessor(CookieJar()), NoRedirect())
+
+	def request(self, route, path, data=None):
+		body = urlencode(data, doseq=True).encode() if data is not None else None
+		start = time.perf_counter()
+		status = None
+		try:
+			response = self.opener.open(Request(self.base_url + path, data=body))
+			response.read()
+			status = response.status
+		except HTTPError as err:
+			status = err.code
+		except Exception:
+			status = None
+		self.record(route, time.perf_counter() - start, status is not None and status < 400)
+
+	def random_id(self, key):
+		low, high = self.manifest[key]
+		return self.rng.randint(low, high)
+
+	def login(self, kind):
+		email = self.manifest[kind + '_email'] % self.random_id(kind + '_ids')
+		self.request('POST /%ss/validate/login' % kind, '/%ss/validate/login' % kind, {'email': email, 'password': self.manifest['password']})
+
+	def signup(self, kind):
+		email = 'load.%s@example.com' % uuid.uuid4().hex
+		form = {'email': email, 'password': 'Passw0rd', 'confirm_password': 'Passw0rd',
+			'addr_street': '100 Load Test Way', 'addr_2': '', 'addr_city': 'Seattle', 'addr_state': '47'}
+		if kind == 'dev':
+			form.update({'fname': 'Load', 'lname': 'Tester'})
+		else:
+			form.update({'org_name': 'Load Test Org', 'rep_name': 'Load Tester'})
+		self.request('POST /%ss/signup' % kind, '/%ss/signup' % kind, form)
+		self.request('GET /logout', '/logout')
+
+	def session(self, deadline, pages_per_login):
+		kind = self.rng.choice(['dev', 'org'])
+		if self.rng.random() < 0.05:
+			self.signup(kind)
+			return
+		self.login(kind)
+		for _ in range(pages_per_login):
+			if time.perf_counter() > deadline:
+				break
+			pick = self.rng.random()
+			if kind == 'dev' and pick < 0.5:
+				self.request('GET /devs/dashboard', '/devs/dashboard')
+			elif kind == 'org' and pick < 0.5:
+				self.request('GET /orgs/dashboard', '/orgs/dashboard')
+			elif pick < 0.8 and self.manifest['pos_ids']:
+				self.request('GET /orgs/jobs/<pos_id>', '/orgs/jobs/%d' % self.random_id('pos_ids'))
+			else:
+				self.request('GET /devs/profile/<dev_id>', '/devs/profile/%d' % self.random_id('dev_ids'))
+		self.request('GET /logout', '/logout')
+
+
+def percentile(sorted_values, pct):
+	if not sorted_values:
+		return 0.0
+	index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+	return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+	routes = {}
+	for route, values in sorted(samples.items()):
+		latencies = sorted(latency for latency, ok in values)
+		routes[route] = {
+			'count': len(values),
+			'errors': sum(1 for latency, ok in values if not ok),
+			'rps': round(len(values) / elapsed, 2),
+			'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+			'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+			'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+			'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+		}
+	return routes
+
+
+def print_report(result, baseline=None):
+	print("%-30s %8s %7s %9s %9s %9s %9s" % ('route', 'count', 'errors', 'rps', 'p50 ms', 'p95 ms', 'p99 ms'))
+	for route, stats in result['routes'].items():
+		line = "%-30s %8d %7d %9.1f %9.1f %9.1f %9.1f" % (route, stats['count'], stats['errors'], stats['rps'], stats['p50_ms'], stats['p95_ms'], stats['p99_ms'])
+		old = (baseline or {}).get('routes', {}).get(route)
+		if old and old['p95_ms']:
+			line += "   p95 %+.0f%%, rps %+.0f%%" % ((stats['p95_ms'] / old['p95_ms'] - 1) * 100, (stats['rps'] / old['rps'] - 1) * 100 if old['rps'] else 0)
+		print(line)
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+	parser.add_argument('--manifest', default='instance/seed_manifest.json')
+	parser.add_argument('--concurrency', type=int, default=8)
+	parser.add_argument('--duration', type=float, default=30.0, help="seconds")
+	parser.add_argument('--pages-per-login', type=int, default=10)
+	parser.add_argument('--seed', type=int, default=None)
+	parser.add_argument('--output', help="write the JSON baseline here")
+	parser.add_argument('--compare', help="earlier JSON baseline to diff against")
+	args = parser.parse_args()
+
+	with open(args.manifest) as manifest_file:
+		manifest = json.load(manifest_file)
+
+	samples = {}
+	lock = threading.Lock()
+
+	def record(route, latency, ok):
+		with lock:
+			samples.setdefault(route, []).append((latency, ok))
+
+	start = time.perf_counter()
+	deadline = start + args.duration
+
+	def worker(n):
+		user = VirtualUser(args.base_url, manifest, random.Random(None if args.seed is None else args.seed + n), record)
+		while time.perf_counter() < deadline:
+			user.session(deadline, args.pages_per_login)
+
+	threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.concurrency)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	elapsed = time.perf_counter() - start
+
+	result = {
+		'base_url': args.base_url,
+		'concurrency': args.concurrency,
+		'duration_s': round(elapsed, 2),
+		'total_requests': sum(len(values) for values in samples.values()),
+		'routes': summarize(samples, elapsed),
+	}
+
+	baseline = None
+	if args.compare:
+		with open(args.compare) as baseline_file:
+			baseline = json.load(baseline_file)
+	print_report(result, baseline)
+
+	if args.output:
+		with open(args.output, 'w') as output_file:
+			json.dump(result, output_file, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+	main()
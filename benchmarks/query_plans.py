@@ -0,0 +1,113 @@
+"""Query-plan and timing benchmark for the login / signup / foreign-key lookups.
+
+Builds a throwaway SQLite database from the app's models (so it carries the
+same indexes the migrations create), fills it with N devs (plus N/10 orgs and
+N/2 positions with a few skills each), then runs EXPLAIN QUERY PLAN and times
+every hot query.  Exits non-zero if any of them still does a full table scan.
+
+    python benchmarks/query_plans.py                       # 10k, 100k, 1M devs
+    python benchmarks/query_plans.py --sizes 10000,100000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from models import db
+
+LANG_COUNT = 21
+FRAME_LIB_COUNT = 17
+REPEAT = 200
+
+# name -> (sql, parameter factory); the SQL mirrors what the ORM emits in the views
+HOT_QUERIES = [
+	('dev login / signup email check', "SELECT id, password FROM devs WHERE email = ?", lambda n: ('dev%d@example.com' % random.randint(1, n),)),
+	('org login / signup email check', "SELECT id, password FROM orgs WHERE email = ?", lambda n: ('org%d@example.com' % random.randint(1, max(n // 10, 1)),)),
+	('Org.positions', "SELECT id, name FROM positions WHERE positions.org = ?", lambda n: (random.randint(1, max(n // 10, 1)),)),
+	('devs knowing a language', "SELECT dev_id FROM dev_langs WHERE lang_id = ? LIMIT 50", lambda n: (random.randint(1, LANG_COUNT),)),
+	('devs knowing a framework', "SELECT dev_id FROM dev_frame_lib WHERE framelib_id = ? LIMIT 50", lambda n: (random.randint(1, FRAME_LIB_COUNT),)),
+	('positions needing a language', "SELECT pos_id FROM position_langs WHERE lang_id = ? LIMIT 50", lambda n: (random.randint(1, LANG_COUNT),)),
+	('positions needing a framework', "SELECT pos_id FROM position_frame_lib WHERE framelib_id = ? LIMIT 50", lambda n: (random.randint(1, FRAME_LIB_COUNT),)),
+]
+
+
+def build_database(path, dev_count):
+	engine = create_engine('sqlite:///' + path)
+	db.metadata.create_all(engine)
+	engine.dispose()
+
+	conn = sqlite3.connect(path)
+	org_count = max(dev_count // 10, 1)
+	pos_count = max(dev_count // 2, 1)
+	conn.executemany("INSERT INTO langs (id, name, img) VALUES (?, ?, '')", [(i, 'lang%d' % i) for i in range(1, LANG_COUNT + 1)])
+	conn.executemany("INSERT INTO framelib (id, name, img) VALUES (?, ?, '')", [(i, 'frame%d' % i) for i in range(1, FRAME_LIB_COUNT + 1)])
+	conn.executemany("INSERT INTO devs (id, first_name, last_name, email, password, address_state) VALUES (?, 'Dev', 'Eloper', ?, 'x', 47)",
+		((i, 'dev%d@example.com' % i) for i in range(1, dev_count + 1)))
+	conn.executemany("INSERT INTO orgs (id, org_name, email, password) VALUES (?, 'Org', ?, 'x')",
+		((i, 'org%d@example.com' % i) for i in range(1, org_count + 1)))
+	conn.executemany("INSERT INTO positions (id, org, name, description) VALUES (?, ?, 'Job', 'Job description')",
+		((i, random.randint(1, org_count)) for i in range(1, pos_count + 1)))
+	conn.executemany("INSERT INTO dev_langs (dev_id, lang_id) VALUES (?, ?)",
+		((i, lang_id) for i in range(1, dev_count + 1) for lang_id in random.sample(range(1, LANG_COUNT + 1), 3)))
+	conn.executemany("INSERT INTO dev_frame_lib (dev_id, framelib_id) VALUES (?, ?)",
+		((i, frame_id) for i in range(1, dev_count + 1) for frame_id in random.sample(range(1, FRAME_LIB_COUNT + 1), 2)))
+	conn.executemany("INSERT INTO position_langs (pos_id, lang_id) VALUES (?, ?)",
+		((i, lang_id) for i in range(1, pos_count + 1) for lang_id in random.sample(range(1, LANG_COUNT + 1), 2)))
+	conn.executemany("INSERT INTO position_frame_lib (pos_id, framelib_id) VALUES (?, ?)",
+		((i, frame_id) for i in range(1, pos_count + 1) for frame_id in random.sample(range(1, FRAME_LIB_COUNT + 1), 2)))
+	conn.commit()
+	conn.execute("ANALYZE")
+	return conn
+
+
+def query_plan(conn, sql, params):
+	return [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def time_query(conn, sql, make_params, dev_count):
+	start = time.perf_counter()
+	for _ in range(REPEAT):
+		conn.execute(sql, make_params(dev_count)).fetchall()
+	return (time.perf_counter() - start) / REPEAT * 1e6
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--sizes', default='10000,100000,1000000', help="comma separated dev counts")
+	args = parser.parse_args()
+
+	scans = []
+	for dev_count in [int(size) for size in args.sizes.split(',')]:
+		tmp_dir = tempfile.mkdtemp()
+		path = os.path.join(tmp_dir, 'bench.db')
+		print("== %d devs ==" % dev_count)
+		start = time.perf_counter()
+		conn = build_database(path, dev_count)
+		print("   (built in %.1fs)" % (time.perf_counter() - start))
+
+		for name, sql, make_params in HOT_QUERIES:
+			plan = query_plan(conn, sql, make_params(dev_count))
+			micros = time_query(conn, sql, make_params, dev_count)
+			full_scan = [step for step in plan if step.startswith('SCAN')]
+			if full_scan:
+				scans.append((dev_count, name, full_scan))
+			print("   %-32s %9.1f us   %s%s" % (name, micros, '; '.join(plan), '   <-- FULL SCAN' if full_scan else ''))
+
+		conn.close()
+		os.remove(path)
+		os.rmdir(tmp_dir)
+
+	if scans:
+		print("\n%d hot queries still scan a whole table" % len(scans))
+		sys.exit(1)
+	print("\nno full table scans")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,118 @@
+"""Candidate shortlist on a position page: live grouped join vs loading every dev.
+
+Builds the same throwaway SQLite database as query_plans.py at each size and,
+for a sample of positions, times match_table.shortlist() for the first page
+and for a page deep in the keyset (the cursor taken from --depth pages in),
+next to the approach it replaces - load every dev with their skills and score
+them in Python.  The Python baseline is skipped past --python-max devs.
+The join only reads devs sharing a skill with the position (through the
+covering lang_id/framelib_id indexes), but it has to score and sort every one
+of them before the first row comes back - the ranking key is an aggregate, so
+no index can hand rows over in score order.  Its time is therefore linear in
+the 'matching devs' column ('us/match' stays roughly constant) and grows with
+the dev table whenever matches do; it is not flat.  What stays flat is depth:
+a deep keyset page costs the same as the first.  The baseline reads the whole
+dev table every time.
+
+    python benchmarks/shortlist_scaling.py                      # 10k, 50k, 100k, 200k devs
+    python benchmarks/shortlist_scaling.py --sizes 10000,100000 --positions 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from models import db
+import match_table
+from query_plans import build_database
+
+
+MATCHING_DEVS = text("SELECT COUNT(DISTINCT dev_id) FROM ("
+	"SELECT dev_id FROM dev_langs JOIN position_langs USING (lang_id) WHERE pos_id = :id UNION ALL "
+	"SELECT dev_id FROM dev_frame_lib JOIN position_frame_lib USING (framelib_id) WHERE pos_id = :id)")
+
+
+def python_shortlist(session, pos_id, limit):
+	wanted_langs = set(session.execute(text("SELECT lang_id FROM position_langs WHERE pos_id = :id"), {'id': pos_id}).scalars())
+	wanted_frame_libs = set(session.execute(text("SELECT framelib_id FROM position_frame_lib WHERE pos_id = :id"), {'id': pos_id}).scalars())
+	langs, frame_libs = {}, {}
+	for dev_id, lang_id in session.execute(text("SELECT dev_id, lang_id FROM dev_langs")):
+		langs.setdefault(dev_id, set()).add(lang_id)
+	for dev_id, frame_id in session.execute(text("SELECT dev_id, framelib_id FROM dev_frame_lib")):
+		frame_libs.setdefault(dev_id, set()).add(frame_id)
+	scored = []
+	for dev_id in session.execute(text("SELECT id FROM devs")).scalars():
+		score = len(langs.get(dev_id, ()) & wanted_langs) * match_table.LANG_WEIGHT + len(frame_libs.get(dev_id, ()) & wanted_frame_libs) * match_table.FRAME_LIB_WEIGHT
+		if score:
+			scored.append((-score, dev_id))
+	return sorted(scored)[:limit]
+
+
+def median_ms(samples):
+	return sorted(samples)[len(samples) // 2] * 1000
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--sizes', default='10000,50000,100000,200000', help="comma separated dev counts")
+	parser.add_argument('--positions', type=int, default=30, help="positions sampled per size")
+	parser.add_argument('--page-size', type=int, default=20)
+	parser.add_argument('--depth', type=int, default=10, help="page the deep cursor is taken from")
+	parser.add_argument('--python-max', type=int, default=100000)
+	args = parser.parse_args()
+
+	print("%-8s %14s %12s %10s %12s %12s %14s" % ('devs', 'matching devs', 'page 1 ms', 'us/match', 'page %d ms' % args.depth, 'python ms', 'first page ok'))
+	for dev_count in [int(size) for size in args.sizes.split(',')]:
+		tmp_dir = tempfile.mkdtemp()
+		path = os.path.join(tmp_dir, 'bench.db')
+		build_database(path, dev_count).close()
+		engine = create_engine('sqlite:///' + path)
+		session = Session(engine)
+		tables = db.metadata.tables
+		pos_ids = random.sample(range(1, max(dev_count // 2, 1) + 1), args.positions)
+
+		first, deep, python, matching = [], [], [], []
+		agrees = True
+		for pos_id in pos_ids:
+			start = time.perf_counter()
+			rows, cursor = match_table.shortlist(session, tables, pos_id, args.page_size)
+			first.append(time.perf_counter() - start)
+
+			for _ in range(args.depth - 2):
+				if cursor is None:
+					break
+				rows, cursor = match_table.shortlist(session, tables, pos_id, args.page_size, after=cursor)
+			if cursor is not None:
+				start = time.perf_counter()
+				match_table.shortlist(session, tables, pos_id, args.page_size, after=cursor)
+				deep.append(time.perf_counter() - start)
+
+			matching.append(session.execute(MATCHING_DEVS, {'id': pos_id}).scalar())
+
+		if dev_count <= args.python_max:
+			for pos_id in pos_ids[:5]:
+				start = time.perf_counter()
+				expected = python_shortlist(session, pos_id, args.page_size)
+				python.append(time.perf_counter() - start)
+				rows, cursor = match_table.shortlist(session, tables, pos_id, args.page_size)
+				agrees = agrees and [(-row.score, row.dev_id) for row in rows] == expected
+
+		median_matching = sorted(matching)[len(matching) // 2]
+		print("%-8d %14d %12.1f %10.2f %12s %12s %14s" % (dev_count, median_matching, median_ms(first), median_ms(first) * 1000 / max(median_matching, 1),
+			'%.1f' % median_ms(deep) if deep else 'n/a', '%.1f' % median_ms(python) if python else 'skipped', 'yes' if agrees else 'NO'))
+
+		session.close()
+		engine.dispose()
+		os.remove(path)
+		os.rmdir(tmp_dir)
+
+
+if __name__ == '__main__':
+	main()
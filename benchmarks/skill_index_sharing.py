@@ -0,0 +1,105 @@
+"""Orgs dashboard facet index: per-process bitmaps vs the shared skill index file.
+
+Builds the same throwaway SQLite database as query_plans.py at each size,
+writes a skill index generation (skill_index.build) and compares what one
+worker pays to get a ready facet index each way: a cold load from the
+association tables versus mapping the file and reading only the devs
+changed since it was built.  It also reports the bitmap bytes each worker
+keeps on its own heap - the mapped file is one copy in the page cache no
+matter how many workers share it - and search latency for random filters,
+checking both indexes return the same devs and counts.
+
+    python benchmarks/skill_index_sharing.py                    # 10k, 50k, 100k devs
+    python benchmarks/skill_index_sharing.py --sizes 100000 --searches 500
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from models import db
+import facets
+import skill_index
+from query_plans import build_database, LANG_COUNT, FRAME_LIB_COUNT
+
+
+def heap_bytes(index):
+	return sum(sys.getsizeof(bits) for postings in index.values.values() for bits in postings.values()) + sys.getsizeof(index.all_devs)
+
+
+def random_selection():
+	selection = {'lang': random.sample(range(1, LANG_COUNT + 1), random.randint(0, 2)), 'frame_lib': random.sample(range(1, FRAME_LIB_COUNT + 1), random.randint(0, 1))}
+	return selection, random.random() < 0.3
+
+
+def nonzero(counts):
+	return dict((facet, dict((value_id, count) for value_id, count in values.items() if count)) for facet, values in counts.items())
+
+
+def median_ms(samples):
+	return sorted(samples)[len(samples) // 2] * 1000
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--sizes', default='10000,50000,100000', help="comma separated dev counts")
+	parser.add_argument('--searches', type=int, default=200)
+	args = parser.parse_args()
+
+	print("%-8s %10s %10s %12s %12s %12s %12s %11s %11s %6s" % ('devs', 'build ms', 'file KB', 'db load ms', 'map load ms',
+		'heap KB db', 'heap KB map', 'search db', 'search map', 'same'))
+	for dev_count in [int(size) for size in args.sizes.split(',')]:
+		tmp_dir = tempfile.mkdtemp()
+		path = os.path.join(tmp_dir, 'bench.db')
+		index_path = os.path.join(tmp_dir, 'skill_index.bin')
+		build_database(path, dev_count).close()
+		engine = create_engine('sqlite:///' + path)
+		session = Session(engine)
+		tables = db.metadata.tables
+
+		start = time.perf_counter()
+		skill_index.build(session, tables, index_path)
+		build = time.perf_counter() - start
+
+		start = time.perf_counter()
+		plain = facets.sync(session, tables, facets.FacetIndex())
+		db_load = time.perf_counter() - start
+
+		start = time.perf_counter()
+		shared = skill_index.SkillIndex(index_path)
+		mapped = facets.sync(session, tables, facets.FacetIndex(), shared.current())
+		map_load = time.perf_counter() - start
+
+		plain_times, mapped_times = [], []
+		same = True
+		for _ in range(args.searches):
+			selection, match_all = random_selection()
+			start = time.perf_counter()
+			expected = plain.search(selection, match_all)
+			plain_times.append(time.perf_counter() - start)
+			start = time.perf_counter()
+			found = mapped.search(selection, match_all)
+			mapped_times.append(time.perf_counter() - start)
+			same = same and found[0] == expected[0] and nonzero(found[1]) == nonzero(expected[1])
+
+		print("%-8d %10.1f %10.1f %12.1f %12.1f %12.1f %12.1f %11.2f %11.2f %6s" % (dev_count, build * 1000, os.path.getsize(index_path) / 1024.0,
+			db_load * 1000, map_load * 1000, heap_bytes(plain) / 1024.0, heap_bytes(mapped) / 1024.0,
+			median_ms(plain_times), median_ms(mapped_times), 'yes' if same else 'NO'))
+
+		session.close()
+		engine.dispose()
+		shared = mapped = None
+		os.remove(index_path)
+		os.remove(path)
+		os.rmdir(tmp_dir)
+
+
+if __name__ == '__main__':
+	main()
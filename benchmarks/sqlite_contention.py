@@ -0,0 +1,124 @@
+"""Write-contention benchmark: stock SQLite settings vs the tuned sqlite profile.
+
+Starts several worker processes (like gunicorn workers) against one database
+file.  Each runs a signup/skills-update style mix - mostly reads with some
+short write transactions - for a fixed time.  Reports throughput, p95
+latency and how many operations failed with "database is locked" for each
+setup.
+
+    python benchmarks/sqlite_contention.py --workers 8 --seconds 10
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+import config
+
+SCHEMA = [
+	"CREATE TABLE devs (id INTEGER PRIMARY KEY, email VARCHAR(255), profile_bio TEXT, date_updated DATETIME)",
+	"CREATE UNIQUE INDEX ix_devs_email ON devs (email)",
+	"CREATE TABLE dev_langs (dev_id INTEGER, lang_id INTEGER, PRIMARY KEY (dev_id, lang_id))",
+]
+SEED_DEVS = 20000
+
+
+def make_engine(mode, url):
+	if mode == 'default':
+		# what the app did before profiles: stock pool, rollback journal, no pragmas
+		engine = create_engine(url)
+		config.apply_sqlite_pragmas(engine, [('journal_mode', 'DELETE')])
+		return engine
+	settings = config.load_profile({'DB_PROFILE': 'sqlite', 'DATABASE_URL': url})
+	engine = create_engine(url, **settings['SQLALCHEMY_ENGINE_OPTIONS'])
+	config.apply_sqlite_pragmas(engine, settings['SQLITE_PRAGMAS'])
+	return engine
+
+
+def prepare(mode, path):
+	engine = make_engine(mode, 'sqlite:///' + path)
+	with engine.begin() as conn:
+		for statement in SCHEMA:
+			conn.execute(text(statement))
+		conn.execute(text("INSERT INTO devs (id, email, profile_bio) VALUES (:id, :email, 'bio')"),
+			[{'id': i, 'email': 'dev%d@example.com' % i} for i in range(1, SEED_DEVS + 1)])
+	engine.dispose()
+
+
+def worker(mode, path, seconds, write_ratio, worker_id, results):
+	engine = make_engine(mode, 'sqlite:///' + path)
+	rng = random.Random(worker_id)
+	latencies = []
+	locked = 0
+	deadline = time.time() + seconds
+	n = 0
+	while time.time() < deadline:
+		n += 1
+		start = time.perf_counter()
+		try:
+			if rng.random() < write_ratio:
+				dev_id = rng.randint(1, SEED_DEVS)
+				with engine.begin() as conn:
+					conn.execute(text("UPDATE devs SET profile_bio = :bio, date_updated = CURRENT_TIMESTAMP WHERE id = :id"), {'bio': 'bio %d' % n, 'id': dev_id})
+					conn.execute(text("DELETE FROM dev_langs WHERE dev_id = :id"), {'id': dev_id})
+					conn.execute(text("INSERT INTO dev_langs (dev_id, lang_id) VALUES (:id, :lang)"), [{'id': dev_id, 'lang': lang} for lang in rng.sample(range(1, 22), 3)])
+			else:
+				with engine.connect() as conn:
+					conn.execute(text("SELECT id, profile_bio FROM devs WHERE email = :email"), {'email': 'dev%d@example.com' % rng.randint(1, SEED_DEVS)}).fetchall()
+					conn.execute(text("SELECT lang_id FROM dev_langs WHERE dev_id = :id"), {'id': rng.randint(1, SEED_DEVS)}).fetchall()
+			latencies.append(time.perf_counter() - start)
+		except OperationalError as err:
+			if 'locked' in str(err):
+				locked += 1
+			else:
+				raise
+	engine.dispose()
+	results.put((latencies, locked))
+
+
+def run(mode, workers, seconds, write_ratio):
+	tmp_dir = tempfile.mkdtemp()
+	path = os.path.join(tmp_dir, 'contention.db')
+	prepare(mode, path)
+
+	results = multiprocessing.Queue()
+	procs = [multiprocessing.Process(target=worker, args=(mode, path, seconds, write_ratio, i, results)) for i in range(workers)]
+	for proc in procs:
+		proc.start()
+	collected = [results.get() for _ in procs]
+	for proc in procs:
+		proc.join()
+
+	for name in os.listdir(tmp_dir):
+		os.remove(os.path.join(tmp_dir, name))
+	os.rmdir(tmp_dir)
+
+	latencies = sorted(latency for worker_latencies, locked in collected for latency in worker_latencies)
+	locked = sum(locked for worker_latencies, locked in collected)
+	p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+	return len(latencies) / seconds, p95, locked
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--workers', type=int, default=8)
+	parser.add_argument('--seconds', type=float, default=10.0)
+	parser.add_argument('--write-ratio', type=float, default=0.2)
+	args = parser.parse_args()
+
+	print("%d processes, %.0f%% writes, %.0fs each" % (args.workers, args.write_ratio * 100, args.seconds))
+	print("%-8s %10s %10s %10s" % ('profile', 'ops/sec', 'p95 ms', 'locked'))
+	for mode in ('default', 'tuned'):
+		rate, p95, locked = run(mode, args.workers, args.seconds, args.write_ratio)
+		print("%-8s %10.0f %10.2f %10d" % (mode, rate, p95 * 1000, locked))
+
+
+if __name__ == '__main__':
+	main()
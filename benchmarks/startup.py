@@ -0,0 +1,145 @@
+"""Worker startup budget: import time, app creation and first-request latency.
+
+Every measurement runs in a fresh interpreter, the way a worker starts.
+`python -X importtime` shows where import time goes; a probe process then
+times `import app` (which builds the app via create_app) and the first and
+second requests to a couple of pages, with the template bytecode cache cold
+(empty directory) and warm (what a restarted worker sees).  It also checks
+that the migration tooling stayed out of the serving process.  The medians
+are compared against BUDGET and the script exits non-zero when one is over,
+so it can run in CI.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --top 15
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# milliseconds, medians across runs
+BUDGET = {
+	'import_app': 900,
+	'first_request_cold': 150,
+	'first_request_warm': 60,
+}
+# never imported by a serving process - 'flask db' loads them itself
+CLI_ONLY_MODULES = ('alembic', 'flask_migrate')
+PAGES = ['/devs/login', '/devs/register']
+
+
+def probe(pages):
+	started = time.perf_counter()
+	from app import app
+	imported = time.perf_counter()
+	client = app.test_client()
+	first = {}
+	for page in pages:
+		before = time.perf_counter()
+		client.get(page)
+		first[page] = time.perf_counter() - before
+	before = time.perf_counter()
+	client.get(pages[0])
+	again = time.perf_counter() - before
+	print(json.dumps({
+		'import_app': imported - started,
+		'first_request': sum(first.values()),
+		'repeat_request': again,
+		'cli_only_loaded': sorted(name for name in sys.modules if name.split('.')[0] in CLI_ONLY_MODULES),
+	}))
+
+
+def serving_env(**extra):
+	env = dict(os.environ, PYTHONPATH=ROOT, **extra)
+	env.pop('FLASK_RUN_FROM_CLI', None)
+	return env
+
+
+def run_probe(jinja_cache_dir):
+	output = subprocess.run([sys.executable, os.path.abspath(__file__), '--probe'], cwd=ROOT, env=serving_env(JINJA_CACHE_DIR=jinja_cache_dir),
+		check=True, capture_output=True, text=True).stdout
+	return json.loads(output.strip().splitlines()[-1])
+
+
+# (self time us summed per top-level package, package), biggest first
+def import_profile():
+	stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=ROOT, env=serving_env(),
+		check=True, capture_output=True, text=True).stderr
+	totals = {}
+	for line in stderr.splitlines():
+		if not line.startswith('import time:') or 'cumulative' in line:
+			continue
+		self_us, cumulative_us, name = line[len('import time:'):].split('|')
+		package = name.strip().split('.')[0]
+		totals[package] = totals.get(package, 0) + int(self_us)
+	return sorted(((us, name) for name, us in totals.items()), reverse=True)
+
+
+def median(values):
+	values = sorted(values)
+	return values[len(values) // 2]
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--runs', type=int, default=5)
+	parser.add_argument('--top', type=int, default=10, help="Slowest packages to list.")
+	parser.add_argument('--probe', action='store_true', help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	if args.probe:
+		probe(PAGES)
+		return
+
+	profile = import_profile()
+	print("import time by package (-X importtime, self time summed)")
+	for us, name in profile[:args.top]:
+		print("  %-32s %8.1f ms" % (name, us / 1000.0))
+
+	warm_dir = tempfile.mkdtemp(prefix='jinja_warm_')
+	run_probe(warm_dir)
+	cold, warm = [], []
+	try:
+		for _ in range(args.runs):
+			cold_dir = tempfile.mkdtemp(prefix='jinja_cold_')
+			try:
+				cold.append(run_probe(cold_dir))
+			finally:
+				shutil.rmtree(cold_dir)
+			warm.append(run_probe(warm_dir))
+	finally:
+		shutil.rmtree(warm_dir)
+
+	results = {
+		'import_app': median([sample['import_app'] for sample in cold + warm]) * 1000,
+		'first_request_cold': median([sample['first_request'] for sample in cold]) * 1000,
+		'first_request_warm': median([sample['first_request'] for sample in warm]) * 1000,
+		'repeat_request': median([sample['repeat_request'] for sample in warm]) * 1000,
+	}
+	print("\n%d runs, medians (first request = %s)" % (args.runs, ' + '.join(PAGES)))
+	print("%-22s %10s %10s" % ('stage', 'ms', 'budget'))
+	over = []
+	for stage, value in results.items():
+		budget = BUDGET.get(stage)
+		print("%-22s %10.1f %10s" % (stage, value, budget if budget is not None else '-'))
+		if budget is not None and value > budget:
+			over.append(stage)
+
+	loaded = sorted(set(name for sample in cold + warm for name in sample['cli_only_loaded']))
+	if loaded:
+		print("\nmigration tooling imported while serving: %s" % ', '.join(loaded[:5]))
+		over.append('cli_only_modules')
+	if over:
+		print("\nover budget: %s" % ', '.join(over))
+		sys.exit(1)
+	print("\nwithin budget")
+
+
+if __name__ == '__main__':
+	main()
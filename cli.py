@@ -0,0 +1,165 @@
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+import assets
+import job_queue
+import match_table
+import position_archive
+import skill_index
+from extensions import hasher, refdata, gazetteer
+from models import db, Dev, Org
+from notifications import notify_position_matches
+from org_views import validate_position
+from position_import import import_positions
+from seed import seed_database, write_manifest
+from view_helpers import state_abbrev
+
+# 'flask ...' commands.  Registered on every app, but nothing here runs
+# unless the command is invoked; 'flask db' is added by create_app() for CLI
+# processes only.
+
+assets_cli = AppGroup('assets', help="Build fingerprinted static assets.")
+
+@assets_cli.command('build')
+def assets_build():
+	"""Pack the icon sprite, minify and hash CSS/JS into static/dist."""
+	assets.build(current_app.static_folder, echo=click.echo)
+	click.echo("Restart the app to serve the new files, then run 'flask assets prune'.")
+
+
+@assets_cli.command('prune')
+def assets_prune():
+	"""Delete built files the current manifest no longer lists."""
+	assets.prune(current_app.static_folder, echo=click.echo)
+
+
+@click.command('refdata-reload')
+def refdata_reload():
+	"""Invalidate the cached languages, frameworks and states in every worker."""
+	refdata.invalidate_all()
+	click.echo("Reference data cache invalidated.")
+
+
+@click.command('seed')
+@click.option('--devs', default=1000, help="Number of developers to create.")
+@click.option('--orgs', default=100, help="Number of organizations to create.")
+@click.option('--positions', default=500, help="Number of positions to create.")
+@click.option('--password', default='Passw0rd', help="Password shared by every seeded account.")
+@click.option('--seed', 'rng_seed', default=None, type=int, help="Random seed for repeatable data.")
+def seed_command(devs, orgs, positions, password, rng_seed):
+	"""Fill the database with synthetic devs, orgs and positions for load testing."""
+	tables = db.metadata.tables
+	manifest = seed_database(db.session, tables, devs, orgs, positions, hasher.hash(password), seed=rng_seed, echo=click.echo)
+	manifest['password'] = password
+	match_table.rebuild(db.session, tables, echo=click.echo)
+	geocode_all(click.echo)
+	skill_index.build(db.session, tables, current_app.config['SKILL_INDEX_FILE'], echo=click.echo)
+
+	if not os.path.isdir(current_app.instance_path):
+		os.makedirs(current_app.instance_path)
+	manifest_path = os.path.join(current_app.instance_path, 'seed_manifest.json')
+	write_manifest(manifest_path, manifest)
+	click.echo("Wrote %s for benchmarks/load_test.py" % manifest_path)
+
+
+def geocode_all(echo):
+	for model in (Dev, Org):
+		rows = db.session.query(model.id, model.address_city, model.address_state).all()
+		updates = []
+		for row_id, city, state in rows:
+			lat, lon, cell = gazetteer.locate(city, state_abbrev(state))
+			updates.append({'row_id': row_id, 'lat': lat, 'lon': lon, 'geo_cell': cell})
+		table = model.__table__
+		for start in range(0, len(updates), 5000):
+			db.session.execute(table.update().where(table.c.id == db.bindparam('row_id')).values(lat=db.bindparam('lat'), lon=db.bindparam('lon'), geo_cell=db.bindparam('geo_cell')), updates[start:start + 5000])
+			db.session.commit()
+		echo("%s: %d located, %d unknown" % (table.name, sum(1 for row in updates if row['geo_cell'] is not None), sum(1 for row in updates if row['geo_cell'] is None)))
+
+@click.command('geocode')
+def geocode_command():
+	"""Fill lat/lon/geo_cell for every dev and org from the bundled centroid table."""
+	geocode_all(click.echo)
+
+
+@click.command('import-positions')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--org', 'org_ref', required=True, help="Id or email of the organization posting the jobs.")
+@click.option('--chunk-size', default=500, help="Rows per transaction.")
+def import_positions_command(path, org_ref, chunk_size):
+	"""Bulk-load positions from a CSV or JSON Lines file.
+
+	Each row needs name and description; languages and frameworks are
+	skill names (a list in JSON, ';' separated in CSV).
+	"""
+	org = Org.query.get(int(org_ref)) if org_ref.isdigit() else Org.query.filter_by(email=org_ref).first()
+	if org is None:
+		raise click.BadParameter("no organization matches '%s'" % org_ref, param_hint='--org')
+
+	# match rows and notification jobs for each chunk are written in the chunk's own transaction
+	def on_written(pos_ids):
+		match_table.refresh_positions(db.session, db.metadata.tables, pos_ids)
+		for pos_id in pos_ids:
+			job_queue.enqueue(db.session, db.metadata.tables, 'notify_matches', {'pos_id': pos_id})
+
+	report = import_positions(db.session, db.metadata.tables, path, org.id, validate_position, refdata.get(), chunk_size, on_written)
+
+	for line_no, message in report.errors:
+		click.echo("line %d: %s" % (line_no, message), err=True)
+	click.echo("Imported %d positions for %s in %.2fs (%.0f rows/sec), %d rows rejected." % (report.imported, org.org_name, report.elapsed, report.rows_per_sec, len(report.errors)))
+
+
+def run_notify_matches(payload):
+	notify_position_matches(db.session, db.metadata.tables, payload['pos_id'], current_app.config['NOTIFY_CHUNK_SIZE'], current_app.config['MAIL_SPOOL_DIR'])
+
+def run_rebuild_skill_index(payload):
+	skill_index.build(db.session, db.metadata.tables, current_app.config['SKILL_INDEX_FILE'])
+
+JOB_HANDLERS = {
+	'notify_matches': run_notify_matches,
+	skill_index.REBUILD_JOB: run_rebuild_skill_index,
+}
+
+@click.command('worker')
+@click.option('--poll', default=1.0, help="Seconds to sleep when the queue is empty.")
+@click.option('--once', is_flag=True, help="Exit once no job is due instead of polling.")
+def worker_command(poll, once):
+	"""Run background jobs (match notifications, skill index rebuilds) from the jobs table."""
+	worker = job_queue.Worker(db.session, db.metadata.tables, JOB_HANDLERS, current_app.config['JOB_VISIBILITY_TIMEOUT'], echo=click.echo)
+	click.echo("worker %s started" % worker.worker_id)
+	try:
+		worker.run(poll_interval=poll, once=once)
+	except KeyboardInterrupt:
+		pass
+	click.echo("worker %s stopped: %d jobs done, %d failed" % (worker.worker_id, worker.processed, worker.failed))
+
+
+@click.command('rebuild-matches')
+@click.option('--batch-size', default=1000, help="Dev ids per transaction.")
+def rebuild_matches_command(batch_size):
+	"""Recompute the dev_position_match table from the skill association tables."""
+	match_table.rebuild(db.session, db.metadata.tables, batch_size, echo=click.echo)
+	click.echo("Match table rebuilt.")
+
+
+@click.command('compact-positions')
+@click.option('--batch-size', default=500, help="Positions moved per transaction.")
+def compact_positions_command(batch_size):
+	"""Expire overdue positions and move closed ones into the archive tables."""
+	expired = position_archive.expire_due(db.session, db.metadata.tables)
+	db.session.commit()
+	archived = position_archive.compact(db.session, db.metadata.tables, batch_size, echo=click.echo)
+	click.echo("%d positions expired, %d archived." % (len(expired), archived))
+
+
+@click.command('rebuild-skill-index')
+def rebuild_skill_index_command():
+	"""Write a new generation of the shared skill bitmap file and swap it in."""
+	skill_index.build(db.session, db.metadata.tables, current_app.config['SKILL_INDEX_FILE'], echo=click.echo)
+
+
+def register_commands(app):
+	for command in (assets_cli, refdata_reload, seed_command, geocode_command, import_positions_command, worker_command, rebuild_matches_command, compact_positions_command, rebuild_skill_index_command):
+		app.cli.add_command(command)
@@ -0,0 +1,95 @@
+import gzip
+import zlib
+
+try:
+	import brotli
+except ImportError:		# optional - gzip only without it
+	brotli = None
+
+# Negotiated response compression that also works on streamed bodies.
+# A buffered body is compressed in one go; a streamed one is wrapped so every
+# chunk is compressed and flushed as it passes through, and the client can
+# start parsing the page while the rest is still being rendered.
+# ETags become weak, since the compressed bytes differ from the identity ones.
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/x-ndjson', 'application/javascript', 'image/svg+xml')
+MIN_SIZE = 500
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5		# streaming favours speed; 11 is far slower for a few % more
+
+
+def choose_encoding(accept_encodings):
+	if brotli is not None and accept_encodings['br']:
+		return 'br'
+	if accept_encodings['gzip']:
+		return 'gzip'
+	return None
+
+
+def compress_stream(chunks, encoding):
+	if encoding == 'br':
+		compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+		for chunk in chunks:
+			if chunk:
+				yield compressor.process(chunk) + compressor.flush()
+		yield compressor.finish()
+	else:
+		compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)		# gzip container
+		for chunk in chunks:
+			if chunk:
+				yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+		yield compressor.flush()
+
+
+def compress_body(data, encoding):
+	if encoding == 'br':
+		return brotli.compress(data, quality=BROTLI_QUALITY)
+	return gzip.compress(data, GZIP_LEVEL)
+
+
+# coalesce a template stream into ~size byte writes; an empty chunk flushes early
+def coalesce(chunks, size=8192):
+	parts = []
+	length = 0
+	for chunk in chunks:
+		if not chunk:
+			if parts:
+				yield ''.join(parts)
+				parts = []
+				length = 0
+			continue
+		parts.append(chunk)
+		length += len(chunk)
+		if length >= size:
+			yield ''.join(parts)
+			parts = []
+			length = 0
+	if parts:
+		yield ''.join(parts)
+
+
+# after_request hook body - request is the Flask/Werkzeug request
+def compress_response(request, response):
+	response.vary.add('Accept-Encoding')
+	if response.status_code != 200 or 'Content-Encoding' in response.headers or response.direct_passthrough:
+		return response
+	if not response.mimetype or not response.mimetype.startswith(COMPRESSIBLE_TYPES):
+		return response
+	encoding = choose_encoding(request.accept_encodings)
+	if encoding is None:
+		return response
+
+	if response.is_streamed:
+		response.response = compress_stream(response.iter_encoded(), encoding)
+		response.headers.pop('Content-Length', None)
+	else:
+		data = response.get_data()
+		if len(data) < MIN_SIZE:
+			return response
+		response.set_data(compress_body(data, encoding))
+
+	response.headers['Content-Encoding'] = encoding
+	etag, weak = response.get_etag()
+	if etag and not weak:
+		response.set_etag(etag, weak=True)
+	return response
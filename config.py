@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+# Database backend profiles.
+# DB_PROFILE picks one (default: postgres when DATABASE_URL points at
+# PostgreSQL, sqlite otherwise); DATABASE_URL overrides the connection string.
+#
+#   sqlite   - WAL journal so readers don't block behind the writer, a busy
+#              timeout instead of instant "database is locked", and
+#              synchronous/mmap/cache pragmas applied to every new connection
+#   postgres - a pre-pinged QueuePool sized for a handful of gunicorn workers;
+#              needs PostgreSQL 12+ (search uses generated tsvector columns)
+#
+# Both use TimedQueuePool, which records how long each checkout waited so the
+# numbers can be published on /metrics.
+
+
+class PoolStats(object):
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self.checkouts = 0
+		self.wait_total = 0.0
+		self.wait_max = 0.0
+		self.timeouts = 0
+
+	def record(self, waited, timed_out=False):
+		with self._lock:
+			self.checkouts += 1
+			self.wait_total += waited
+			if waited > self.wait_max:
+				self.wait_max = waited
+			if timed_out:
+				self.timeouts += 1
+
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+
+	def _do_get(self):
+		start = time.perf_counter()
+		try:
+			conn = super(TimedQueuePool, self)._do_get()
+		except Exception:
+			pool_stats.record(time.perf_counter() - start, timed_out=True)
+			raise
+		pool_stats.record(time.perf_counter() - start)
+		return conn
+
+
+class SQLiteProfile(object):
+	NAME = 'sqlite'
+	SQLALCHEMY_DATABASE_URI = 'sqlite:///devs_on_deck.db'
+	SQLALCHEMY_ENGINE_OPTIONS = {
+		'poolclass': TimedQueuePool,
+		'pool_size': 5,
+		'max_overflow': 10,
+		'pool_timeout': 30,
+		# seconds the driver itself waits on a lock; busy_timeout below does the same in SQLite
+		'connect_args': {'timeout': 30, 'check_same_thread': False},
+	}
+	SQLITE_PRAGMAS = [
+		('journal_mode', 'WAL'),
+		('busy_timeout', 5000),
+		('synchronous', 'NORMAL'),
+		('mmap_size', 256 * 1024 * 1024),
+		('cache_size', -64 * 1024),		# negative = KiB, so 64MB of page cache per connection
+		('temp_store', 'MEMORY'),
+	]
+
+
+class PostgresProfile(object):
+	NAME = 'postgres'
+	SQLALCHEMY_DATABASE_URI = 'postgresql://localhost/devs_on_deck'
+	SQLALCHEMY_ENGINE_OPTIONS = {
+		'poolclass': TimedQueuePool,
+		'pool_size': 10,
+		'max_overflow': 20,
+		'pool_timeout': 10,
+		'pool_pre_ping': True,
+		'pool_recycle': 1800,
+	}
+	SQLITE_PRAGMAS = []
+
+
+PROFILES = {
+	SQLiteProfile.NAME: SQLiteProfile,
+	PostgresProfile.NAME: PostgresProfile,
+}
+
+
+def load_profile(environ=os.environ):
+	url = environ.get('DATABASE_URL')
+	name = environ.get('DB_PROFILE')
+	if not name:
+		name = PostgresProfile.NAME if url and url.startswith('postgres') else SQLiteProfile.NAME
+	if name not in PROFILES:
+		raise RuntimeError("Unknown DB_PROFILE '%s' (expected one of: %s)" % (name, ', '.join(sorted(PROFILES))))
+
+	profile = PROFILES[name]
+	settings = {
+		'DB_PROFILE': name,
+		'SQLALCHEMY_DATABASE_URI': url or profile.SQLALCHEMY_DATABASE_URI,
+		'SQLALCHEMY_ENGINE_OPTIONS': dict(profile.SQLALCHEMY_ENGINE_OPTIONS),
+		'SQLITE_PRAGMAS': list(profile.SQLITE_PRAGMAS),
+	}
+	return settings
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+	if not pragmas or engine.dialect.name != 'sqlite':
+		return
+
+	@event.listens_for(engine, 'connect')
+	def set_pragmas(dbapi_connection, connection_record):
+		cursor = dbapi_connection.cursor()
+		for name, value in pragmas:
+			cursor.execute('PRAGMA %s = %s' % (name, value))
+		cursor.close()
+
+
+def pool_status(engine):
+	pool = engine.pool
+	status = {
+		'checkouts': pool_stats.checkouts,
+		'checkout_wait_seconds_total': pool_stats.wait_total,
+		'checkout_wait_seconds_max': pool_stats.wait_max,
+		'checkout_timeouts': pool_stats.timeouts,
+	}
+	if isinstance(pool, QueuePool):
+		status.update({'size': pool.size(), 'checked_out': pool.checkedout(), 'overflow': pool.overflow()})
+	return status
@@ -0,0 +1,229 @@
+import re
+from datetime import datetime
+
+from flask import Blueprint, current_app, render_template, redirect, request, session, flash, make_response
+from sqlalchemy.sql import func
+
+import match_table
+import position_archive
+import skill_index
+from extensions import refdata
+from models import db, Dev, Org, Position, Language, FrameLib, dev_lang_table, dev_frame_lib_table, notifications_table
+from skill_service import sync_skills
+from view_helpers import set_location, job_cards, lazy_cards, stream_page, refresh_dev_facets, page_validators, not_modified, conditional_headers
+
+devs = Blueprint('devs', __name__)
+
+
+#######################################
+## VALIDATE FORM DATA and UPDATE DEV ##
+#######################################
+@devs.route('/devs/profile/edit/update', methods=['POST'])
+def dev_update_profile():
+	if 'userid' not in session:
+		return redirect('/')
+
+	is_valid = True
+	EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9.+_-]+@[a-zA-Z0-9._-]+\.[a-zA-Z]+$')
+	NAME_REGEX = re.compile(r'^[a-zA-Z]+$')
+
+	cur_user = Dev.query.get(session['userid'])
+
+	# Validate name fields
+	if len(request.form['fname']) < 2 or len(request.form['lname']) < 2:
+		flash("Both your first and last name must be at least 2 characters long.", 'reg_error')
+		is_valid = False
+	else:
+		if NAME_REGEX.match(request.form['fname']) is None or NAME_REGEX.match(request.form['lname']) is None:
+			flash("Your name can only contain letters.", 'reg_error')
+			is_valid = False
+
+	if cur_user.email != request.form['email']:
+		if EMAIL_REGEX.match(request.form['email']):
+			checkEmail = Dev.query.filter_by(email=request.form['email']).first()
+			if checkEmail:
+				flash("Account already exists with this Email.", 'reg_error')
+				is_valid = False
+		else:
+			flash("Email address not valid.", 'reg_error')
+			is_valid = False
+
+	# City and State at least required for location
+	if len(request.form['addr_city']) < 2 or len(request.form['addr_state']) < 2:
+		flash("Must enter at least a City and State for your address.", 'reg_error')
+		is_valid = False
+
+	# Record data and flash success
+	if is_valid:
+		cur_user.first_name = request.form['fname']
+		cur_user.last_name = request.form['lname']
+		cur_user.email = request.form['email']
+		cur_user.address = request.form['addr_street']
+		cur_user.address_2 = request.form['addr_2']
+		cur_user.address_city = request.form['addr_city']
+		cur_user.address_state = request.form['addr_state']
+		set_location(cur_user)
+		db.session.commit()
+		refresh_dev_facets(cur_user.id)
+
+		return redirect('/devs/dashboard')
+
+	return redirect('/devs/profile/edit')
+
+
+####################
+## DEVS DASHBOARD ##
+####################
+@devs.route('/devs/dashboard')
+def devs_dashboard():
+	if 'userid' not in session:
+		return redirect('/')
+
+	cur_user = Dev.query.get(session['userid'])
+	cur_state = refdata.get().state(cur_user.address_state)
+
+	# best matches come straight off dev_position_match; newest postings fill any remaining slots.
+	# runs once the page head is already on its way
+	def ranked_stamps():
+		top_k = current_app.config['MATCH_TOP_K']
+		ranked = [pos_id for pos_id, score in match_table.top_positions(db.session, db.metadata.tables, cur_user.id, top_k)]
+		if len(ranked) < top_k:
+			newest = db.session.query(Position.id).filter(Position.status == position_archive.OPEN).order_by(Position.id.desc()).limit(top_k)
+			ranked.extend([pos_id for pos_id, in newest if pos_id not in ranked][:top_k - len(ranked)])
+		stamps = {}
+		if ranked:
+			stamps = dict(db.session.query(Position.id, Position.date_updated).filter(Position.id.in_(ranked)))
+		return [(pos_id, stamps[pos_id]) for pos_id in ranked if pos_id in stamps]
+	unread = db.session.query(func.count(notifications_table.c.id)).filter(notifications_table.c.dev_id == cur_user.id, notifications_table.c.read_at.is_(None)).scalar()
+
+	return stream_page("devs_dashboard.html", cur_dev=cur_user, dev_langs=cur_user.devs_skills_langs, dev_frmwrks=cur_user.devs_skills_frame_lib, loc_state=cur_state.abbrev, job_cards=lazy_cards(job_cards, ranked_stamps), unread=unread)
+
+
+################
+## DEVS INBOX ##
+################
+@devs.route('/devs/inbox')
+def devs_inbox():
+	if 'userid' not in session or session['acct_type'] != 'dev':
+		return redirect('/')
+
+	notes = notifications_table
+	rows = db.session.query(notes.c.id, notes.c.pos_id, notes.c.created_at, notes.c.read_at, Position.name, Org.org_name) \
+		.join(Position, Position.id == notes.c.pos_id).join(Org, Org.id == Position.org) \
+		.filter(notes.c.dev_id == session['userid'])
+	# newest first; 'older' is the keyset cursor for the next page down
+	older = request.args.get('older', type=int)
+	if older is not None:
+		rows = rows.filter(notes.c.id < older)
+	page_size = current_app.config['INBOX_PAGE_SIZE']
+	rows = rows.order_by(notes.c.id.desc()).limit(page_size + 1).all()
+	next_cursor = rows[page_size - 1].id if len(rows) > page_size else None
+	rows = rows[:page_size]
+
+	unread_ids = [row.id for row in rows if row.read_at is None]
+	if unread_ids:
+		db.session.execute(notes.update().where(notes.c.id.in_(unread_ids)).values(read_at=datetime.utcnow()))
+		db.session.commit()
+
+	return render_template("inbox.html", notes=rows, next_cursor=next_cursor)
+
+
+#######################
+## VIEW DEVS PROFILE ##
+#######################
+@devs.route('/devs/profile/<dev_id>')
+def devs_profile(dev_id):
+	if 'userid' not in session:
+		return redirect('/')
+
+	# skill changes bump date_updated, so it covers everything on the page
+	etag, last_modified = page_validators(db.session.query(Dev.date_updated).filter(Dev.id == dev_id).scalar())
+	cached = not_modified(etag, last_modified)
+	if cached:
+		return cached
+
+	cur_user = Dev.query.get(dev_id)
+	cur_state = refdata.get().state(cur_user.address_state)
+
+	response = make_response(render_template("devs_dashboard.html", cur_dev=cur_user, dev_langs=cur_user.devs_skills_langs, dev_frmwrks=cur_user.devs_skills_frame_lib, loc_state=cur_state.abbrev))
+	return conditional_headers(response, etag, last_modified)
+
+
+###############################
+## UPDATE SKILLS - LANGUAGES ##
+###############################
+@devs.route('/devs/skills/languages')
+def skills_languages():
+	if 'userid' not in session:
+		return redirect('/')
+
+	langs_list = refdata.get().langs
+	cur_user = Dev.query.get(session['userid'])
+
+	cur_langs_id_list = []
+	for lang in cur_user.devs_skills_langs:
+		cur_langs_id_list.append(lang.id)
+
+	return render_template("dev_languages.html", all_langs=langs_list, dev_langs=cur_user.devs_skills_langs, dev_langs_id=cur_langs_id_list, cur_dev=cur_user)
+
+
+################################
+## UPDATE SKILLS - FRAMEWORKS ##
+################################
+@devs.route('/devs/skills/frameworks')
+def skills_frameworks():
+	if 'userid' not in session:
+		return redirect('/')
+
+	frmwrk_list = refdata.get().frame_libs
+	cur_user = Dev.query.get(session['userid'])
+
+	cur_frmwrk_id_list = []
+	for frmwrk in cur_user.devs_skills_frame_lib:
+		cur_frmwrk_id_list.append(frmwrk.id)
+
+	return render_template("dev_frameworks.html", all_frmwrks=frmwrk_list, dev_frmwrks=cur_user.devs_skills_frame_lib, dev_frmwrks_id=cur_frmwrk_id_list)
+
+
+#######################
+## DEVS EDIT PROFILE ##
+#######################
+@devs.route('/devs/profile/edit')
+def dev_edit_profile():
+	if 'userid' not in session:
+		return redirect('/')
+
+	curDev = Dev.query.get(session['userid'])
+	state_list = refdata.get().states
+
+	return render_template('dev_edit.html', cur_dev=curDev, all_states=state_list)
+
+
+###########################
+## RECORD SKILLS UPDATES ##
+###########################
+@devs.route('/devs/update_skills', methods=['POST'])
+def dev_update_skills():
+	if 'userid' not in session:
+		return redirect('/')
+
+	if ( len(request.form.getlist('dev_lang_input')) > 0 or 'dev_bio' in request.form):
+		curDev = Dev.query.get(session['userid'])
+		curDev.profile_bio = request.form['dev_bio']
+		sync_skills(db.session, dev_lang_table, 'dev_id', curDev.id, 'lang_id', Language.__table__, request.form.getlist('dev_lang_input'), owner_table=Dev.__table__)
+		match_table.refresh_devs(db.session, db.metadata.tables, [curDev.id])
+		skill_index.request_rebuild(db.session, db.metadata.tables, current_app.config['SKILL_INDEX_REBUILD_DELAY'])
+		db.session.commit()
+		refresh_dev_facets(session['userid'])
+		return redirect('/devs/skills/frameworks')
+
+	elif ( len(request.form.getlist('dev_framework_input')) > 0 ):
+		sync_skills(db.session, dev_frame_lib_table, 'dev_id', session['userid'], 'framelib_id', FrameLib.__table__, request.form.getlist('dev_framework_input'), owner_table=Dev.__table__)
+		match_table.refresh_devs(db.session, db.metadata.tables, [session['userid']])
+		skill_index.request_rebuild(db.session, db.metadata.tables, current_app.config['SKILL_INDEX_REBUILD_DELAY'])
+		db.session.commit()
+		refresh_dev_facets(session['userid'])
+		return redirect('/devs/dashboard')
+
+	# TEMPORARY
+	return redirect('/')
@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+from collections import defaultdict
+
+from sqlalchemy import select
+
+# Streaming exports of devs and positions for the nightly ATS pull.
+# Rows come off a yield_per cursor one partition at a time; each partition
+# picks up its skill ids with one IN query per association table and names
+# them from the reference-data cache, then is serialized and handed to the
+# response before the next partition is read - memory stays flat no matter
+# how many rows there are.
+
+FORMATS = {
+	'ndjson': 'application/x-ndjson',
+	'csv': 'text/csv',
+}
+
+
+class ExportSpec(object):
+
+	# skills: [(field name, association table, owner column, skill column, refdata attribute)]
+	def __init__(self, table, columns, skills, extra=None):
+		self.table = table
+		self.columns = columns
+		self.skills = skills
+		self.extra = extra or {}		# field name -> fn(row, refdata)
+
+	@property
+	def fields(self):
+		return list(self.columns) + list(self.extra) + [skill[0] for skill in self.skills]
+
+
+def iter_records(session, spec, refdata, updated_since=None, batch_size=500):
+	table = spec.table
+	statement = select(*[table.c[name] for name in spec.columns]).order_by(table.c.id)
+	if updated_since is not None:
+		statement = statement.where(table.c.date_updated >= updated_since)
+
+	result = session.execute(statement.execution_options(yield_per=batch_size))
+	for partition in result.partitions():
+		ids = [row.id for row in partition]
+		skill_names = {}
+		for field, assoc_table, owner_col, skill_col, ref_attr in spec.skills:
+			names_by_id = getattr(refdata, ref_attr)
+			owned = defaultdict(list)
+			for owner_id, skill_id in session.execute(select(assoc_table.c[owner_col], assoc_table.c[skill_col]).where(assoc_table.c[owner_col].in_(ids))):
+				if skill_id in names_by_id:
+					owned[owner_id].append(names_by_id[skill_id].name)
+			skill_names[field] = owned
+
+		for row in partition:
+			record = dict(row._mapping)
+			for field, fn in spec.extra.items():
+				record[field] = fn(row, refdata)
+			for field in skill_names:
+				record[field] = sorted(skill_names[field].get(row.id, []))
+			yield record
+
+
+# coalesce many small strings into ~64KB writes
+def buffered(chunks, size=65536):
+	parts = []
+	length = 0
+	for chunk in chunks:
+		parts.append(chunk)
+		length += len(chunk)
+		if length >= size:
+			yield ''.join(parts)
+			parts = []
+			length = 0
+	if parts:
+		yield ''.join(parts)
+
+
+def to_ndjson(records):
+	for record in records:
+		yield json.dumps(record, default=str) + '\n'
+
+
+def to_csv(records, fields):
+	buf = io.StringIO()
+	writer = csv.writer(buf)
+	writer.writerow(fields)
+	yield buf.getvalue()
+	for record in records:
+		buf.seek(0)
+		buf.truncate()
+		writer.writerow([';'.join(record[field]) if isinstance(record[field], list) else record[field] for field in fields])
+		yield buf.getvalue()
@@ -0,0 +1,118 @@
+import os
+import threading
+
+from flask import current_app
+from flask_bcrypt import Bcrypt
+from sqlalchemy import event
+from werkzeug.local import LocalProxy
+
+import assets
+import facets
+import geo
+from fragment_cache import FragmentCache
+from instrumentation import Metrics
+from models import db, Language, FrameLib, State
+from passwords import PasswordHasher
+from rate_limit import RateLimiter
+from skill_index import SkillIndex
+from ref_cache import RefDataCache, RefRow, StateRow
+
+# Process-wide helpers shared by the blueprints.
+# The ones that need the app's config are built by init_app() and kept in
+# app.extensions; the names below are proxies to them, so views, CLI
+# commands and the worker import them the same way whatever app is current.
+# Nothing here opens a connection, socket or thread until first use, and the
+# bigger read-only tables (the gazetteer) are loaded lazily too, so a plain
+# worker starts fast.  Under gunicorn's preload_app, warm_up() fills them in
+# the master instead and every forked worker shares those pages copy-on-write.
+
+bcrypt = Bcrypt()
+metrics = Metrics()
+# in-memory language/framework/state filters for the orgs dashboard - see facets.py.
+# loaded on first use; writes in this process update it right after commit
+facet_index = facets.FacetIndex()
+
+
+_build_lock = threading.Lock()
+
+# name -> factory(app) for the helpers built on first use rather than in init_app
+LAZY = {
+	'gazetteer': lambda app: geo.Gazetteer(app.config['GEO_PLACES_FILE']),
+}
+
+def _lookup(name):
+	state = current_app.extensions['devs_on_deck']
+	if name not in state:
+		with _build_lock:
+			if name not in state:
+				state[name] = LAZY[name](current_app)
+	return state[name]
+
+def _from_app(name):
+	return LocalProxy(lambda: _lookup(name))
+
+hasher = _from_app('hasher')
+limiter = _from_app('limiter')
+# process-wide cache of the lookup tables - see ref_cache.py
+refdata = _from_app('refdata')
+# rendered job/dev cards, keyed on (kind, id, date_updated, refdata version) - see fragment_cache.py
+fragments = _from_app('fragments')
+# offline city/state geocoder - see geo.py
+gazetteer = _from_app('gazetteer')
+# fingerprinted static files from 'flask assets build' - plain files are served until it has run
+asset_manifest = _from_app('asset_manifest')
+# the current skill_index.Generation, re-mapped when a rebuild swaps the file
+skill_index_file = _from_app('skill_index')
+
+
+def load_refdata():
+	langs = [RefRow(*row) for row in db.session.query(Language.id, Language.name, Language.img).order_by(Language.id)]
+	frame_libs = [RefRow(*row) for row in db.session.query(FrameLib.id, FrameLib.name, FrameLib.img).order_by(FrameLib.id)]
+	states = [StateRow(*row) for row in db.session.query(State.id, State.name, State.abbrev).order_by(State.id)]
+	return langs, frame_libs, states
+
+
+def init_app(app):
+	bcrypt.init_app(app)
+	app.extensions['devs_on_deck'] = {
+		'hasher': PasswordHasher(bcrypt, rounds=app.config['BCRYPT_LOG_ROUNDS'], max_workers=app.config['PASSWORD_WORKERS'], max_pending=app.config['PASSWORD_MAX_PENDING'], timeout=app.config['PASSWORD_TIMEOUT']),
+		'limiter': RateLimiter(app.config['RATE_LIMIT_DB']),
+		'refdata': RefDataCache(load_refdata, app.config['REFDATA_STAMP_FILE']),
+		'fragments': FragmentCache(app.config['FRAGMENT_CACHE_BYTES']),
+		'asset_manifest': assets.load_manifest(app.static_folder),
+		'skill_index': SkillIndex(app.config['SKILL_INDEX_FILE']),
+		# newest template mtime, part of every page ETag (see view_helpers.page_validators)
+		'templates_stamp': templates_stamp(os.path.join(app.root_path, app.template_folder)),
+	}
+
+
+# load everything a request would otherwise load on first use, then drop the
+# pool's connections so forked workers don't share the master's sockets
+def warm_up(app):
+	with app.app_context():
+		for name in LAZY:
+			_lookup(name)
+		refdata.get()
+		skill_index_file.current()
+		for template_name in app.jinja_env.list_templates():
+			app.jinja_env.get_template(template_name)
+		db.session.remove()
+		db.engine.dispose()
+
+
+def templates_stamp(folder):
+	return max(os.path.getmtime(os.path.join(root, name)) for root, dirs, files in os.walk(folder) for name in files)
+
+
+# write hook - any committed change to a lookup table invalidates every worker's copy
+@event.listens_for(db.session, 'before_flush')
+def flag_refdata_writes(session, flush_context, instances):
+	for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+		if isinstance(obj, (Language, FrameLib, State)):
+			session.info['refdata_changed'] = True
+			return
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_refdata(session):
+	if session.info.pop('refdata_changed', False):
+		refdata.invalidate_all()
@@ -0,0 +1,208 @@
+import threading
+from itertools import islice
+from datetime import timedelta
+
+from sqlalchemy import select, func
+
+# In-memory facet index for filtering devs by language, framework and state.
+# Every facet value keeps a posting list as a bitmap (a Python int, bit N set
+# when dev N has the value), so combining filters is a handful of big-int
+# AND/ORs and a count is a popcount.
+#
+# Within a facet the chosen values are OR'd ("Python or Go"), or AND'd for
+# skills when match_all is set; facets are AND'd together.  Counts follow the
+# usual disjunctive rule: a facet's counts apply every filter except its own,
+# so picking one language still shows how many devs the others would add.
+#
+# Each process holds its own copy.  The writing request updates its own
+# process's copy straight after commit (update_devs); sync() then catches up
+# on devs whose date_updated moved since the last look, which covers writes
+# made by other workers, using the date_updated index.
+#
+# When a skill index file is available (see skill_index.py) its bitmaps are
+# the base, read from the shared mapping on each search, and the process only
+# keeps the devs that changed since that generation was built (the overlay):
+# a posting list is (base & ~changed) | overlay.
+
+FACETS = ('lang', 'frame_lib', 'state')
+# func.now() stamps have one-second resolution, so re-read a little behind the watermark
+SYNC_OVERLAP = timedelta(seconds=2)
+# where a skill_index.Generation keeps each facet's bitmaps, and the bitmap of every dev
+BASE_SECTIONS = {'lang': 'dev_langs', 'frame_lib': 'dev_frame_lib', 'state': 'dev_state'}
+BASE_ALL_DEVS = ('devs', 0)
+
+
+def popcount(bits):
+	return bits.bit_count()
+
+
+# set bit positions in ascending order, optionally only those above after / below before
+def iter_ids(bits, after=None, before=None, descending=False):
+	if after is not None:
+		bits &= ~((1 << (after + 1)) - 1)
+	if before is not None:
+		bits &= (1 << before) - 1
+	while bits:
+		if descending:
+			bit = bits.bit_length() - 1
+		else:
+			bit = (bits & -bits).bit_length() - 1
+		yield bit
+		bits &= ~(1 << bit)
+
+
+# keyset paging over a bitmap, ascending ids.  Returns (ids, prev_cursor, next_cursor):
+# pass next_cursor back as after= for the following page and prev_cursor as
+# before= for the one in front; a cursor is None when there is no such page.
+def page(bits, page_size, after=None, before=None):
+	if before is not None:
+		ids = list(islice(iter_ids(bits, before=before, descending=True), page_size + 1))
+		has_prev = len(ids) > page_size
+		ids = list(reversed(ids[:page_size]))
+		has_next = True
+	else:
+		ids = list(islice(iter_ids(bits, after=after), page_size + 1))
+		has_next = len(ids) > page_size
+		ids = ids[:page_size]
+		has_prev = after is not None
+
+	if not ids:
+		return ids, None, None
+	return ids, ids[0] if has_prev else None, ids[-1] if has_next else None
+
+
+class FacetIndex(object):
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self.loaded = False
+		self.watermark = None
+		self.base = None		# skill_index.Generation, or None when everything is in-process
+		self.changed = 0		# devs whose values below override the base
+		self.all_devs = 0
+		self.values = dict((facet, {}) for facet in FACETS)		# facet -> value id -> bitmap
+
+	# start over from a skill index generation; sync() then reads the devs changed since it was built
+	def rebase(self, generation):
+		with self._lock:
+			self.base = generation
+			self.changed = 0
+			self.all_devs = 0
+			self.values = dict((facet, {}) for facet in FACETS)
+			self.watermark = generation.watermark
+			self.loaded = True
+
+	def set_dev(self, dev_id, **facet_values):
+		bit = 1 << dev_id
+		with self._lock:
+			self.changed |= bit
+			self.all_devs |= bit
+			for facet, value_ids in facet_values.items():
+				if value_ids is None:
+					continue
+				postings = self.values[facet]
+				for value_id in list(postings):
+					if postings[value_id] & bit and value_id not in value_ids:
+						postings[value_id] &= ~bit
+				for value_id in value_ids:
+					postings[value_id] = postings.get(value_id, 0) | bit
+
+	def _everyone(self):
+		if self.base is None:
+			return self.all_devs
+		return (self.base.bitmap(*BASE_ALL_DEVS) & ~self.changed) | self.all_devs
+
+	def _postings(self, facet, value_id):
+		bits = self.values[facet].get(value_id, 0)
+		if self.base is None:
+			return bits
+		return (self.base.bitmap(BASE_SECTIONS[facet], value_id) & ~self.changed) | bits
+
+	def _value_ids(self, facet):
+		if self.base is None:
+			return list(self.values[facet])
+		return sorted(set(self.values[facet]) | set(self.base.keys(BASE_SECTIONS[facet])))
+
+	def _matching(self, facet, chosen, match_all, everyone):
+		if match_all and facet != 'state':
+			bits = everyone
+			for value_id in chosen:
+				bits &= self._postings(facet, value_id)
+			return bits
+		bits = 0
+		for value_id in chosen:
+			bits |= self._postings(facet, value_id)
+		return bits
+
+	# selection: facet -> list of value ids.  returns (matching bitmap, {facet: {value id: count}})
+	def search(self, selection, match_all=False):
+		with self._lock:
+			everyone = self._everyone()
+			per_facet = dict((facet, self._matching(facet, selection[facet], match_all, everyone)) for facet in FACETS if selection.get(facet))
+			matched = everyone
+			for bits in per_facet.values():
+				matched &= bits
+
+			counts = {}
+			for facet in FACETS:
+				others = everyone
+				for other, bits in per_facet.items():
+					if other != facet:
+						others &= bits
+				counts[facet] = dict((value_id, popcount(others & self._postings(facet, value_id))) for value_id in self._value_ids(facet))
+		return matched, counts
+
+
+def devs_facet_values(session, tables, dev_ids=None):
+	devs, dev_langs, dev_frame_lib = tables['devs'], tables['dev_langs'], tables['dev_frame_lib']
+	found = {}
+	statement = select(devs.c.id, devs.c.address_state)
+	if dev_ids is not None:
+		statement = statement.where(devs.c.id.in_(dev_ids))
+	for dev_id, state in session.execute(statement):
+		found[dev_id] = {'lang': set(), 'frame_lib': set(), 'state': set()}
+		# the signup form posts the state id as text and SQLite keeps it that way
+		try:
+			found[dev_id]['state'].add(int(state))
+		except (TypeError, ValueError):
+			pass
+	for table, column, facet in ((dev_langs, 'lang_id', 'lang'), (dev_frame_lib, 'framelib_id', 'frame_lib')):
+		statement = select(table.c.dev_id, table.c[column])
+		if dev_ids is not None:
+			statement = statement.where(table.c.dev_id.in_(dev_ids))
+		for dev_id, value_id in session.execute(statement):
+			if dev_id in found:
+				found[dev_id][facet].add(value_id)
+	return found
+
+
+def update_devs(session, tables, index, dev_ids):
+	if not index.loaded:
+		return
+	for dev_id, values in devs_facet_values(session, tables, dev_ids).items():
+		index.set_dev(dev_id, **values)
+
+
+# full load the first time, then only devs whose date_updated moved since the last call.
+# the watermark is (newest date_updated, devs stamped with it) so a signup landing in
+# the same second as the last sync still counts as a change.  given a newer skill index
+# generation, the index rebases onto it first and only the devs changed since are read
+def sync(session, tables, index, generation=None):
+	if generation is not None and generation is not index.base:
+		index.rebase(generation)
+	devs = tables['devs']
+	newest = session.execute(select(func.max(devs.c.date_updated))).scalar()
+	ties = session.execute(select(func.count()).select_from(devs).where(devs.c.date_updated == newest)).scalar() if newest is not None else 0
+	if index.loaded and index.watermark == (newest, ties):
+		return index
+
+	changed = None
+	if index.loaded and index.watermark[0] is not None:
+		statement = select(devs.c.id).where(devs.c.date_updated >= index.watermark[0] - SYNC_OVERLAP)
+		changed = session.execute(statement).scalars().all()
+
+	for dev_id, values in devs_facet_values(session, tables, changed).items():
+		index.set_dev(dev_id, **values)
+	index.watermark = (newest, ties)
+	index.loaded = True
+	return index
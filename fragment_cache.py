@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+
+# LRU cache for rendered HTML fragments (the job and developer cards).
+# Keys carry the row's date_updated, so an edited row simply misses and its
+# stale entry ages out; nothing has to be invalidated by hand.  Size is capped
+# by the total UTF-8 size of the cached strings rather than by entry count,
+# so a page of non-ASCII names and bios counts for what it weighs.
+
+
+class FragmentCache(object):
+
+	def __init__(self, max_bytes=8 * 1024 * 1024):
+		self.max_bytes = max_bytes
+		self._lock = threading.Lock()
+		self._entries = OrderedDict()		# key -> (fragment, cost in bytes)
+		self.size = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def get(self, key):
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				self.misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+			return entry[0]
+
+	def put(self, key, fragment):
+		cost = len(fragment.encode('utf-8'))
+		if cost > self.max_bytes:
+			return
+		with self._lock:
+			old = self._entries.pop(key, None)
+			if old is not None:
+				self.size -= old[1]
+			self._entries[key] = (fragment, cost)
+			self.size += cost
+			while self.size > self.max_bytes:
+				evicted_key, (evicted, evicted_cost) = self._entries.popitem(last=False)
+				self.size -= evicted_cost
+				self.evictions += 1
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self.size = 0
+
+	def __len__(self):
+		return len(self._entries)
+
+	# render_fn(missing_keys) must return {key: html} for the keys it was given
+	def get_many(self, keys, render_fn):
+		found = {}
+		missing = []
+		for key in keys:
+			fragment = self.get(key)
+			if fragment is None:
+				missing.append(key)
+			else:
+				found[key] = fragment
+		if missing:
+			for key, fragment in render_fn(missing).items():
+				self.put(key, fragment)
+				found[key] = fragment
+		return [found[key] for key in keys if key in found]
@@ -0,0 +1,84 @@
+import csv
+import math
+import re
+
+from sqlalchemy import select
+
+# Offline geocoding and proximity lookups.
+# geo_data/us_places.csv holds city centroids plus one centroid per state;
+# an address resolves to its city when the city is listed for that state and
+# to the state centroid otherwise, with no network calls.
+#
+# Each located row also stores geo_cell, the id of the CELL_DEGREES x
+# CELL_DEGREES grid square it falls in.  A radius search turns the circle's
+# bounding box into the handful of cells it covers, reads just those rows
+# through the geo_cell index, and only then does exact great-circle math.
+
+CELL_DEGREES = 0.5
+LON_CELLS = int(360 / CELL_DEGREES)
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = 69.0
+
+
+def normalize_city(name):
+	name = re.sub(r'[^a-z ]', '', (name or '').lower().replace('-', ' '))
+	name = ' '.join(name.split())
+	if name.startswith('st '):
+		name = 'saint ' + name[3:]
+	elif name.startswith('ft '):
+		name = 'fort ' + name[3:]
+	return name
+
+
+def cell_of(lat, lon):
+	return int(math.floor((lat + 90) / CELL_DEGREES)) * LON_CELLS + int(math.floor((lon + 180) / CELL_DEGREES))
+
+
+# every cell touched by the box around a radius - a small superset of the circle
+def cells_within(lat, lon, miles):
+	lat_span = miles / MILES_PER_DEGREE_LAT
+	lon_span = miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+	low_row = int(math.floor((max(lat - lat_span, -90) + 90) / CELL_DEGREES))
+	high_row = int(math.floor((min(lat + lat_span, 90) + 90) / CELL_DEGREES))
+	low_col = int(math.floor((max(lon - lon_span, -180) + 180) / CELL_DEGREES))
+	high_col = int(math.floor((min(lon + lon_span, 180) + 180) / CELL_DEGREES))
+	return [row * LON_CELLS + col for row in range(low_row, high_row + 1) for col in range(low_col, high_col + 1)]
+
+
+def distance_miles(lat1, lon1, lat2, lon2):
+	lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+	a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+	return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+class Gazetteer(object):
+
+	def __init__(self, path):
+		self.cities = {}		# (normalized city, state abbrev) -> (lat, lon)
+		self.states = {}		# state abbrev -> (lat, lon)
+		with open(path, newline='') as source:
+			for row in csv.DictReader(source):
+				point = (float(row['lat']), float(row['lon']))
+				if row['kind'] == 'state':
+					self.states[row['state']] = point
+				else:
+					self.cities[(normalize_city(row['name']), row['state'])] = point
+
+	# (lat, lon, geo_cell), or Nones when even the state is unknown
+	def locate(self, city, state_abbrev):
+		point = self.cities.get((normalize_city(city), state_abbrev)) or self.states.get(state_abbrev)
+		if point is None:
+			return None, None, None
+		return point[0], point[1], cell_of(*point)
+
+
+# [(id, miles), ...] nearest first for rows of a table with lat/lon/geo_cell columns
+def nearby(session, table, lat, lon, miles, limit=None):
+	statement = select(table.c.id, table.c.lat, table.c.lon).where(table.c.geo_cell.in_(cells_within(lat, lon, miles)))
+	found = []
+	for row_id, row_lat, row_lon in session.execute(statement):
+		distance = distance_miles(lat, lon, row_lat, row_lon)
+		if distance <= miles:
+			found.append((row_id, distance))
+	found.sort(key=lambda item: (item[1], item[0]))
+	return found[:limit] if limit else found
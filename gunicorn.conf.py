@@ -0,0 +1,27 @@
+# gunicorn app:app  (picked up from the working directory)
+#
+# The master imports and warms the app once (preload_app); workers are forked
+# from it and share the imported modules, compiled templates, reference data
+# and gazetteer copy-on-write instead of each loading their own.
+import os
+
+# only the reverse proxy talks to this port; the app trusts PROXY_FIX_X_FOR of its
+# X-Forwarded-For hops for the client address (see app.py)
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+
+
+def when_ready(server):
+	from app import app
+	from extensions import warm_up
+	warm_up(app)
+
+
+# belt and braces: a pool connection made in the master must never be used by two processes
+def post_fork(server, worker):
+	from app import app
+	from models import db
+	with app.app_context():
+		db.engine.dispose(close=False)
@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+
+# Request-scoped instrumentation.
+# SQLAlchemy cursor events and Flask's template signals feed per-request
+# counters on flask.g; at the end of the request (for a streamed page, once
+# the response is closed) they are folded into per-endpoint histograms that
+# /metrics renders in Prometheus text format.
+# Nothing is hooked up unless METRICS_ENABLED is set, so the disabled cost is
+# zero.
+
+logger = logging.getLogger('devsondeck.metrics')
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram(object):
+
+	def __init__(self, buckets):
+		self.buckets = buckets
+		self.counts = [0] * len(buckets)
+		self.total = 0.0
+		self.count = 0
+
+	def observe(self, value):
+		for i, bound in enumerate(self.buckets):
+			if value <= bound:
+				self.counts[i] += 1
+		self.total += value
+		self.count += 1
+
+
+class RequestStats(object):
+
+	def __init__(self):
+		self.started = time.perf_counter()
+		self.statements = 0
+		self.db_time = 0.0
+		self.slowest = 0.0
+		self.slowest_sql = None
+		self.render_time = 0.0
+		self.render_started = None
+		self.seen = Counter()
+
+
+# passes a streamed body through, adding up the bytes sent in sent[0]
+def count_bytes(chunks, sent):
+	try:
+		for chunk in chunks:
+			sent[0] += len(chunk)
+			yield chunk
+	finally:
+		if hasattr(chunks, 'close'):
+			chunks.close()
+
+
+def escape_label(value):
+	return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics(object):
+
+	def __init__(self, repeat_threshold=3):
+		self.enabled = False
+		self.repeat_threshold = repeat_threshold
+		self._lock = threading.Lock()
+		self.histograms = {}		# (metric, endpoint) -> Histogram
+		self.counters = Counter()	# (metric, endpoint) -> int
+		self.slowest = {}			# endpoint -> (seconds, sql)
+		self.gauges = []			# (name, help, callback returning {labels or None: value})
+
+	def init_app(self, app, engine):
+		self.enabled = True
+		event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+		event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+		before_render_template.connect(self._before_render, app)
+		template_rendered.connect(self._after_render, app)
+		app.before_request(self._start_request)
+		app.after_request(self._finish_request)
+
+	# other modules publish their own numbers (cache hits, queue depth...) through here
+	def add_gauge(self, name, help_text, callback):
+		self.gauges.append((name, help_text, callback))
+
+	## HOOKS ##
+	def _start_request(self):
+		g._request_stats = RequestStats()
+
+	def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+		conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+	def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+		elapsed = time.perf_counter() - conn.info['query_start'].pop()
+		if not has_request_context():
+			return
+		stats = getattr(g, '_request_stats', None)
+		if stats is None:
+			return
+		stats.statements += 1
+		stats.db_time += elapsed
+		stats.seen[statement] += 1
+		if elapsed > stats.slowest:
+			stats.slowest = elapsed
+			stats.slowest_sql = statement
+
+	def _before_render(self, sender, template, context, **extra):
+		stats = getattr(g, '_request_stats', None)
+		if stats is not None:
+			stats.render_started = time.perf_counter()
+
+	def _after_render(self, sender, template, context, **extra):
+		stats = getattr(g, '_request_stats', None)
+		if stats is not None and stats.render_started is not None:
+			stats.render_time += time.perf_counter() - stats.render_started
+			stats.render_started = None
+
+	def _finish_request(self, response):
+		stats = getattr(g, '_request_stats', None)
+		if stats is None:
+			return response
+		endpoint = request.endpoint or 'unknown'
+		# a streamed page still runs queries and renders while the body is sent, so fold it in once the server closes the response
+		if response.is_streamed:
+			sent = [0]
+			response.response = count_bytes(response.iter_encoded(), sent)
+			response.call_on_close(lambda: self._record(stats, endpoint, sent[0]))
+		else:
+			self._record(stats, endpoint, response.calculate_content_length())
+		return response
+
+	def _record(self, stats, endpoint, size):
+		repeated = [(sql, n) for sql, n in stats.seen.items() if n >= self.repeat_threshold]
+		if repeated:
+			sql, n = max(repeated, key=lambda item: item[1])
+			logger.warning("possible N+1 in %s: statement ran %d times: %s", endpoint, n, sql)
+
+		with self._lock:
+			self._observe('dod_request_duration_seconds', endpoint, time.perf_counter() - stats.started, TIME_BUCKETS)
+			self._observe('dod_sql_statements', endpoint, stats.statements, COUNT_BUCKETS)
+			self._observe('dod_sql_duration_seconds', endpoint, stats.db_time, TIME_BUCKETS)
+			self._observe('dod_template_render_seconds', endpoint, stats.render_time, TIME_BUCKETS)
+			if size is not None:
+				self._observe('dod_response_bytes', endpoint, size, SIZE_BUCKETS)
+			if repeated:
+				self.counters[('dod_repeated_statement_requests_total', endpoint)] += 1
+			if stats.slowest_sql is not None and stats.slowest > self.slowest.get(endpoint, (0.0, None))[0]:
+				self.slowest[endpoint] = (stats.slowest, stats.slowest_sql)
+
+	def _observe(self, name, endpoint, value, buckets):
+		key = (name, endpoint)
+		if key not in self.histograms:
+			self.histograms[key] = Histogram(buckets)
+		self.histograms[key].observe(value)
+
+	## EXPOSITION ##
+	def render(self):
+		lines = []
+		with self._lock:
+			for name in sorted(set(name for name, endpoint in self.histograms)):
+				lines.append('# TYPE %s histogram' % name)
+				for (metric, endpoint), hist in sorted(self.histograms.items()):
+					if metric != name:
+						continue
+					label = 'endpoint="%s"' % escape_label(endpoint)
+					for bound, count in zip(hist.buckets, hist.counts):
+						lines.append('%s_bucket{%s,le="%s"} %d' % (name, label, bound, count))
+					lines.append('%s_bucket{%s,le="+Inf"} %d' % (name, label, hist.count))
+					lines.append('%s_sum{%s} %s' % (name, label, repr(hist.total)))
+					lines.append('%s_count{%s} %d' % (name, label, hist.count))
+
+			lines.append('# HELP dod_repeated_statement_requests_total Requests that ran one statement repeatedly (likely N+1).')
+			lines.append('# TYPE dod_repeated_statement_requests_total counter')
+			for (metric, endpoint), count in sorted(self.counters.items()):
+				lines.append('%s{endpoint="%s"} %d' % (metric, escape_label(endpoint), count))
+
+			lines.append('# HELP dod_sql_slowest_statement_seconds Slowest single statement seen per endpoint.')
+			lines.append('# TYPE dod_sql_slowest_statement_seconds gauge')
+			for endpoint, (seconds, sql) in sorted(self.slowest.items()):
+				lines.append('dod_sql_slowest_statement_seconds{endpoint="%s"} %s' % (escape_label(endpoint), repr(seconds)))
+
+		for name, help_text, callback in self.gauges:
+			lines.append('# HELP %s %s' % (name, help_text))
+			lines.append('# TYPE %s gauge' % name)
+			for labels, value in sorted(callback().items(), key=lambda item: str(item[0])):
+				if labels:
+					lines.append('%s{%s} %s' % (name, ','.join('%s="%s"' % (k, escape_label(v)) for k, v in labels), value))
+				else:
+					lines.append('%s %s' % (name, value))
+
+		return '\n'.join(lines) + '\n'
@@ -0,0 +1,140 @@
+import json
+import os
+import socket
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, and_, or_
+
+# Durable background jobs kept in the app's own database - see 'flask worker'.
+# enqueue() only adds a row and never commits, so a job lands in the same
+# transaction as the change that caused it.  A worker claims the oldest due
+# job by flipping it to 'running' with locked_until = now + visibility
+# timeout; a worker that dies mid-job simply lets the lock lapse and the job
+# becomes claimable again.  Every claim counts as an attempt, so a job that
+# keeps killing or hanging its worker also stops at max_attempts.  A failed
+# job is retried with exponential backoff until max_attempts, then parked as
+# 'failed'.  Handlers must be idempotent,
+# since a job can run more than once.
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def enqueue(session, tables, kind, payload, delay=0, max_attempts=5):
+	now = datetime.utcnow()
+	session.execute(tables['jobs'].insert().values(kind=kind, payload=json.dumps(payload), status=QUEUED,
+		attempts=0, max_attempts=max_attempts, run_after=now + timedelta(seconds=delay), created_at=now))
+
+
+# returns the claimed job row or None; safe with many workers on one queue
+def claim(session, tables, worker_id, visibility_timeout):
+	jobs = tables['jobs']
+	now = datetime.utcnow()
+	lapsed = and_(jobs.c.status == RUNNING, jobs.c.locked_until < now)
+	# a lapsed lock on the last attempt means the worker died running it every time
+	session.execute(jobs.update().where(and_(lapsed, jobs.c.attempts >= jobs.c.max_attempts)).values(
+		status=FAILED, locked_until=None, finished_at=now, last_error="worker lost the job on its last attempt (killed or timed out)"))
+	claimable = or_(and_(jobs.c.status == QUEUED, jobs.c.run_after <= now), and_(lapsed, jobs.c.attempts < jobs.c.max_attempts))
+	for candidate in session.execute(select(jobs.c.id).where(claimable).order_by(jobs.c.run_after, jobs.c.id).limit(5)).scalars().all():
+		# someone else may take it between the SELECT and this UPDATE - the WHERE makes that a no-op
+		claimed = session.execute(jobs.update().where(and_(jobs.c.id == candidate, claimable)).values(
+			status=RUNNING, locked_by=worker_id, locked_until=now + timedelta(seconds=visibility_timeout),
+			attempts=jobs.c.attempts + 1, started_at=now))
+		session.commit()
+		if claimed.rowcount:
+			return session.execute(select(jobs).where(jobs.c.id == candidate)).one()
+	session.commit()
+	return None
+
+
+def complete(session, tables, job):
+	jobs = tables['jobs']
+	session.execute(jobs.update().where(and_(jobs.c.id == job.id, jobs.c.locked_by == job.locked_by)).values(
+		status=DONE, locked_until=None, finished_at=datetime.utcnow(), last_error=None))
+	session.commit()
+
+
+def fail(session, tables, job, error, backoff=5):
+	jobs = tables['jobs']
+	now = datetime.utcnow()
+	if job.attempts >= job.max_attempts:
+		values = {'status': FAILED, 'finished_at': now}
+	else:
+		values = {'status': QUEUED, 'run_after': now + timedelta(seconds=backoff * 2 ** (job.attempts - 1))}
+	session.execute(jobs.update().where(and_(jobs.c.id == job.id, jobs.c.locked_by == job.locked_by)).values(
+		locked_until=None, last_error=error[-2000:], **values))
+	session.commit()
+
+
+# finished jobs are kept for a while for debugging, then dropped
+def purge(session, tables, older_than):
+	jobs = tables['jobs']
+	cutoff = datetime.utcnow() - timedelta(seconds=older_than)
+	deleted = session.execute(jobs.delete().where(and_(jobs.c.status == DONE, jobs.c.finished_at < cutoff))).rowcount
+	session.commit()
+	return deleted
+
+
+# queue depth per status, age of the oldest due job and mean wait of recently started jobs
+def stats(session, tables, window=300):
+	jobs = tables['jobs']
+	now = datetime.utcnow()
+	depth = dict((status, 0) for status in (QUEUED, RUNNING, DONE, FAILED))
+	depth.update(session.execute(select(jobs.c.status, func.count()).group_by(jobs.c.status)).all())
+	oldest = session.execute(select(func.min(jobs.c.run_after)).where(and_(jobs.c.status == QUEUED, jobs.c.run_after <= now))).scalar()
+	recent = session.execute(select(jobs.c.created_at, jobs.c.started_at).where(and_(jobs.c.attempts == 1, jobs.c.started_at >= now - timedelta(seconds=window)))).all()
+	return {
+		'depth': depth,
+		'oldest_due_seconds': (now - oldest).total_seconds() if oldest else 0.0,
+		'recent_wait_seconds': sum((started - created).total_seconds() for created, started in recent) / len(recent) if recent else 0.0,
+	}
+
+
+class Worker(object):
+
+	# handlers: kind -> fn(payload); each handler does its own commits
+	def __init__(self, session, tables, handlers, visibility_timeout=300, backoff=5, echo=print):
+		self.session = session
+		self.tables = tables
+		self.handlers = handlers
+		self.visibility_timeout = visibility_timeout
+		self.backoff = backoff
+		self.echo = echo
+		self.worker_id = '%s:%d' % (socket.gethostname(), os.getpid())
+		self.processed = 0
+		self.failed = 0
+
+	# runs one job if one is due; returns False when the queue had nothing to do
+	def run_one(self):
+		job = claim(self.session, self.tables, self.worker_id, self.visibility_timeout)
+		if job is None:
+			return False
+		start = time.perf_counter()
+		try:
+			handler = self.handlers[job.kind]
+			handler(json.loads(job.payload))
+		except Exception:
+			self.session.rollback()
+			self.failed += 1
+			fail(self.session, self.tables, job, traceback.format_exc(), self.backoff)
+			self.echo("job %d (%s) failed on attempt %d/%d" % (job.id, job.kind, job.attempts, job.max_attempts))
+			return True
+		complete(self.session, self.tables, job)
+		self.processed += 1
+		self.echo("job %d (%s) done in %.3fs, waited %.3fs" % (job.id, job.kind, time.perf_counter() - start, (job.started_at - job.created_at).total_seconds()))
+		return True
+
+	def run(self, poll_interval=1.0, once=False, purge_after=86400):
+		last_purge = 0.0
+		while True:
+			if time.time() - last_purge > 3600:
+				purge(self.session, self.tables, purge_after)
+				last_purge = time.time()
+			if not self.run_one():
+				if once:
+					return
+				time.sleep(poll_interval)
@@ -0,0 +1,129 @@
+from sqlalchemy import select, func, literal, union_all, and_, or_
+
+# Maintenance of the persisted dev_position_match table.
+# A row holds how well one dev fits one position: the number of shared
+# languages and frameworks and a weighted score.  Rows are computed in the
+# database with a grouped join over the association tables and refreshed
+# only for the dev or position whose skills just changed, so both
+# "best jobs for this dev" and "best devs for this job" are one indexed range
+# read.
+#
+# Only rows with at least one shared skill are stored, and each dev keeps at
+# most PER_DEV_CAP rows (their best matches) so the table grows with the
+# number of devs rather than devs x positions.  Adding a position only adds
+# rows for devs it would rank for; 'flask rebuild-matches' trims the rest.
+# The cap means a position's rows can miss devs whose own top list is full,
+# so the org-facing shortlist runs the same grouped join live (shortlist()).
+
+# a matching language counts a little more than a matching framework
+LANG_WEIGHT = 2
+FRAME_LIB_WEIGHT = 1
+PER_DEV_CAP = 100
+
+
+# SELECT dev_id, pos_id, score, lang_matches, frame_lib_matches for the pairs passing the filters.
+# only open positions take part (see position_archive.py)
+def overlap_query(tables, dev_filter=None, pos_filter=None):
+	dl, pl = tables['dev_langs'], tables['position_langs']
+	df, pf = tables['dev_frame_lib'], tables['position_frame_lib']
+	positions = tables['positions']
+	langs = select(dl.c.dev_id.label('dev_id'), pl.c.pos_id.label('pos_id'), literal(1).label('is_lang'), literal(0).label('is_frame_lib')) \
+		.select_from(dl.join(pl, pl.c.lang_id == dl.c.lang_id).join(positions, positions.c.id == pl.c.pos_id)).where(positions.c.status == 'open')
+	frame_libs = select(df.c.dev_id.label('dev_id'), pf.c.pos_id.label('pos_id'), literal(0).label('is_lang'), literal(1).label('is_frame_lib')) \
+		.select_from(df.join(pf, pf.c.framelib_id == df.c.framelib_id).join(positions, positions.c.id == pf.c.pos_id)).where(positions.c.status == 'open')
+	if dev_filter is not None:
+		langs = langs.where(dev_filter(dl.c.dev_id))
+		frame_libs = frame_libs.where(dev_filter(df.c.dev_id))
+	if pos_filter is not None:
+		langs = langs.where(pos_filter(pl.c.pos_id))
+		frame_libs = frame_libs.where(pos_filter(pf.c.pos_id))
+
+	pairs = union_all(langs, frame_libs).subquery('pairs')
+	lang_matches = func.sum(pairs.c.is_lang)
+	frame_lib_matches = func.sum(pairs.c.is_frame_lib)
+	return select(
+		pairs.c.dev_id,
+		pairs.c.pos_id,
+		(lang_matches * LANG_WEIGHT + frame_lib_matches * FRAME_LIB_WEIGHT).label('score'),
+		lang_matches.label('lang_matches'),
+		frame_lib_matches.label('frame_lib_matches'),
+	).group_by(pairs.c.dev_id, pairs.c.pos_id)
+
+
+# keep each dev's best PER_DEV_CAP rows of an overlap query
+def capped(query):
+	scored = query.subquery('scored')
+	ranked = select(scored, func.row_number().over(partition_by=scored.c.dev_id, order_by=(scored.c.score.desc(), scored.c.pos_id.desc())).label('rank')).subquery('ranked')
+	return select(ranked.c.dev_id, ranked.c.pos_id, ranked.c.score, ranked.c.lang_matches, ranked.c.frame_lib_matches).where(ranked.c.rank <= PER_DEV_CAP)
+
+
+def insert_from(session, tables, query):
+	match = tables['dev_position_match']
+	session.execute(match.insert().from_select(['dev_id', 'pos_id', 'score', 'lang_matches', 'frame_lib_matches'], query))
+
+
+## INCREMENTAL REFRESH - run inside the transaction that changed the skills ##
+def refresh_devs(session, tables, dev_ids):
+	dev_ids = list(dev_ids)
+	if not dev_ids:
+		return
+	match = tables['dev_position_match']
+	session.execute(match.delete().where(match.c.dev_id.in_(dev_ids)))
+	insert_from(session, tables, capped(overlap_query(tables, dev_filter=lambda col: col.in_(dev_ids))))
+
+
+def refresh_positions(session, tables, pos_ids):
+	pos_ids = list(pos_ids)
+	if not pos_ids:
+		return
+	match = tables['dev_position_match']
+	session.execute(match.delete().where(match.c.pos_id.in_(pos_ids)))
+
+	# a dev gets the row only if it would make their top PER_DEV_CAP
+	candidates = overlap_query(tables, pos_filter=lambda col: col.in_(pos_ids)).subquery('candidates')
+	cutoff = select(match.c.score).where(match.c.dev_id == candidates.c.dev_id) \
+		.order_by(match.c.score.desc()).limit(1).offset(PER_DEV_CAP - 1).scalar_subquery()
+	insert_from(session, tables, select(candidates).where(or_(cutoff.is_(None), candidates.c.score >= cutoff)))
+
+
+## FULL REBUILD ##
+# one transaction per batch_size-wide slice of dev ids so the writer lock is never held for long
+def rebuild(session, tables, batch_size=1000, echo=None):
+	session.execute(tables['dev_position_match'].delete())
+	session.commit()
+	devs = tables['devs']
+	low, high = session.execute(select(func.min(devs.c.id), func.max(devs.c.id))).one()
+	if low is None:
+		return
+	for start in range(low, high + 1, batch_size):
+		end = start + batch_size - 1
+		insert_from(session, tables, capped(overlap_query(tables, dev_filter=lambda col: and_(col >= start, col <= end))))
+		session.commit()
+		if echo:
+			echo("devs %d-%d done" % (start, min(end, high)))
+
+
+## READS ##
+def top_positions(session, tables, dev_id, limit):
+	match = tables['dev_position_match']
+	return session.execute(select(match.c.pos_id, match.c.score).where(match.c.dev_id == dev_id)
+		.order_by(match.c.score.desc(), match.c.pos_id.desc()).limit(limit)).fetchall()
+
+
+
+# live, uncapped ranking of every dev sharing a skill with the position - one grouped
+# join, best first.  after is the (score, dev_id) of the last row already shown.
+# Every matching dev is scored and sorted on each call, so the cost is linear in
+# the position's matching devs (benchmarks/shortlist_scaling.py); keyset paging
+# only keeps deep pages as cheap as the first.
+# returns (rows of dev_id, score, lang_matches, frame_lib_matches; next cursor or None)
+def shortlist(session, tables, pos_id, limit, after=None):
+	scored = overlap_query(tables, pos_filter=lambda col: col == pos_id).subquery('scored')
+	query = select(scored.c.dev_id, scored.c.score, scored.c.lang_matches, scored.c.frame_lib_matches)
+	if after is not None:
+		score, dev_id = after
+		query = query.where(or_(scored.c.score < score, and_(scored.c.score == score, scored.c.dev_id > dev_id)))
+	rows = session.execute(query.order_by(scored.c.score.desc(), scored.c.dev_id).limit(limit + 1)).fetchall()
+	if len(rows) > limit:
+		return rows[:limit], (rows[limit - 1].score, rows[limit - 1].dev_id)
+	return rows, None
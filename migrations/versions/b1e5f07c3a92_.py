@@ -0,0 +1,48 @@
+"""never reuse position ids once they have been archived
+
+Revision ID: b1e5f07c3a92
+Revises: a6c31f9e0d57
+Create Date: 2026-10-19 09:12:40.331908
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b1e5f07c3a92'
+down_revision = 'a6c31f9e0d57'
+branch_labels = None
+depends_on = None
+
+# Without AUTOINCREMENT SQLite hands out max(id) + 1, so once compaction has
+# moved the newest positions into positions_archive their ids come back.
+# SQLite can only add AUTOINCREMENT by rebuilding the table; batch mode copies
+# the rows and indexes, and the FTS triggers (dropped with the old table) are
+# put back from sqlite_master.  The sequence then starts past every id the
+# archive has seen.  PostgreSQL sequences never go backwards, so it has
+# nothing to do.
+
+
+def rebuild_positions(autoincrement):
+    bind = op.get_bind()
+    triggers = [row[0] for row in bind.execute(sa.text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'positions'"))]
+    with op.batch_alter_table('positions', recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    for trigger in triggers:
+        op.execute(trigger)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    rebuild_positions(True)
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'positions'")
+    op.execute("INSERT INTO sqlite_sequence (name, seq) SELECT 'positions', max("
+        "(SELECT coalesce(max(id), 0) FROM positions), (SELECT coalesce(max(id), 0) FROM positions_archive))")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    rebuild_positions(False)
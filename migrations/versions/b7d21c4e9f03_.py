@@ -0,0 +1,104 @@
+"""full-text search over positions and devs
+
+Revision ID: b7d21c4e9f03
+Revises: 6ec670be8fb5
+Create Date: 2026-10-18 10:41:07.183920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d21c4e9f03'
+down_revision = '6ec670be8fb5'
+branch_labels = None
+depends_on = None
+
+
+# SQLite: FTS5 external-content tables.  The text lives in positions / devs,
+# the virtual tables only hold the inverted index, and the triggers keep it in
+# step.
+def upgrade_sqlite():
+    op.execute("CREATE VIRTUAL TABLE positions_fts USING fts5(name, description, content='positions', content_rowid='id')")
+    op.execute("""
+        CREATE TRIGGER positions_fts_ai AFTER INSERT ON positions BEGIN
+            INSERT INTO positions_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END""")
+    op.execute("""
+        CREATE TRIGGER positions_fts_ad AFTER DELETE ON positions BEGIN
+            INSERT INTO positions_fts(positions_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        END""")
+    op.execute("""
+        CREATE TRIGGER positions_fts_au AFTER UPDATE OF name, description ON positions BEGIN
+            INSERT INTO positions_fts(positions_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO positions_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END""")
+    op.execute("INSERT INTO positions_fts(positions_fts) VALUES ('rebuild')")
+
+    op.execute("CREATE VIRTUAL TABLE devs_fts USING fts5(first_name, last_name, profile_bio, content='devs', content_rowid='id')")
+    op.execute("""
+        CREATE TRIGGER devs_fts_ai AFTER INSERT ON devs BEGIN
+            INSERT INTO devs_fts(rowid, first_name, last_name, profile_bio) VALUES (new.id, new.first_name, new.last_name, new.profile_bio);
+        END""")
+    op.execute("""
+        CREATE TRIGGER devs_fts_ad AFTER DELETE ON devs BEGIN
+            INSERT INTO devs_fts(devs_fts, rowid, first_name, last_name, profile_bio) VALUES ('delete', old.id, old.first_name, old.last_name, old.profile_bio);
+        END""")
+    op.execute("""
+        CREATE TRIGGER devs_fts_au AFTER UPDATE OF first_name, last_name, profile_bio ON devs BEGIN
+            INSERT INTO devs_fts(devs_fts, rowid, first_name, last_name, profile_bio) VALUES ('delete', old.id, old.first_name, old.last_name, old.profile_bio);
+            INSERT INTO devs_fts(rowid, first_name, last_name, profile_bio) VALUES (new.id, new.first_name, new.last_name, new.profile_bio);
+        END""")
+    op.execute("INSERT INTO devs_fts(devs_fts) VALUES ('rebuild')")
+
+
+# PostgreSQL: a stored tsvector column per table, weighted like the bm25()
+# column weights in search.py, with a GIN index.  Generated columns keep
+# themselves current, so no triggers are needed.
+def upgrade_postgresql():
+    op.execute("""
+        ALTER TABLE positions ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'D')) STORED""")
+    op.execute("CREATE INDEX ix_positions_search_vector ON positions USING gin (search_vector)")
+    op.execute("""
+        ALTER TABLE devs ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(first_name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(last_name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(profile_bio, '')), 'D')) STORED""")
+    op.execute("CREATE INDEX ix_devs_search_vector ON devs USING gin (search_vector)")
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        upgrade_sqlite()
+    elif dialect == 'postgresql':
+        upgrade_postgresql()
+
+
+def downgrade_sqlite():
+    op.execute("DROP TRIGGER devs_fts_au")
+    op.execute("DROP TRIGGER devs_fts_ad")
+    op.execute("DROP TRIGGER devs_fts_ai")
+    op.execute("DROP TABLE devs_fts")
+    op.execute("DROP TRIGGER positions_fts_au")
+    op.execute("DROP TRIGGER positions_fts_ad")
+    op.execute("DROP TRIGGER positions_fts_ai")
+    op.execute("DROP TABLE positions_fts")
+
+
+def downgrade_postgresql():
+    op.execute("DROP INDEX ix_devs_search_vector")
+    op.execute("ALTER TABLE devs DROP COLUMN search_vector")
+    op.execute("DROP INDEX ix_positions_search_vector")
+    op.execute("ALTER TABLE positions DROP COLUMN search_vector")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        downgrade_sqlite()
+    elif dialect == 'postgresql':
+        downgrade_postgresql()
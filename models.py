@@ -0,0 +1,187 @@
+from flask_sqlalchemy import SQLAlchemy		# database ORM import
+from sqlalchemy.sql import func
+import position_archive
+
+# an instance of the ORM - bound to the app in create_app (see app.py)
+db = SQLAlchemy()
+
+## !!!!!!!!!!!!!!!!!!!!!!!!!! ##
+## Always run 'flask db init' ##
+## in console to initialize   ##
+## DB once per project.		  ##
+## !!!!!!!!!!!!!!!!!!!!!!!!!! ##
+## -------------------------- ##
+## !!!!!!!!!!!!!!!!!!!!!!!!!! ##
+## USE WHEN classes are       ##
+## changed/added/deleted      ##
+## 'flask db migrate' readies ##
+## changes					  ##
+## 'flask db upgrade' executes##
+## the changes                ##
+## !!!!!!!!!!!!!!!!!!!!!!!!!! ##
+
+
+# many-to-many relationships
+dev_lang_table = db.Table('dev_langs',
+				db.Column('dev_id', db.Integer, db.ForeignKey('devs.id'), primary_key=True),
+				db.Column('lang_id', db.Integer, db.ForeignKey('langs.id'), primary_key=True),
+				# covering index for "which devs know language X"
+				db.Index('ix_dev_langs_lang_id', 'lang_id', 'dev_id')
+				)
+pos_lang_table = db.Table('position_langs',
+				db.Column('pos_id', db.Integer, db.ForeignKey('positions.id'), primary_key=True),
+				db.Column('lang_id', db.Integer, db.ForeignKey('langs.id'), primary_key=True),
+				db.Index('ix_position_langs_lang_id', 'lang_id', 'pos_id')
+				)
+
+dev_frame_lib_table = db.Table('dev_frame_lib',
+				db.Column('dev_id', db.Integer, db.ForeignKey('devs.id'), primary_key=True),
+				db.Column('framelib_id', db.Integer, db.ForeignKey('framelib.id'), primary_key=True),
+				db.Index('ix_dev_frame_lib_framelib_id', 'framelib_id', 'dev_id')
+				)
+pos_frame_lib_table = db.Table('position_frame_lib',
+				db.Column('pos_id', db.Integer, db.ForeignKey('positions.id'), primary_key=True),
+				db.Column('framelib_id', db.Integer, db.ForeignKey('framelib.id'), primary_key=True),
+				db.Index('ix_position_frame_lib_framelib_id', 'framelib_id', 'pos_id')
+				)
+
+# precomputed skill overlap between devs and positions - see match_table.py
+dev_position_match_table = db.Table('dev_position_match',
+				db.Column('dev_id', db.Integer, db.ForeignKey('devs.id'), primary_key=True),
+				db.Column('pos_id', db.Integer, db.ForeignKey('positions.id'), primary_key=True),
+				db.Column('score', db.Integer, nullable=False),
+				db.Column('lang_matches', db.Integer, nullable=False),
+				db.Column('frame_lib_matches', db.Integer, nullable=False),
+				# "best jobs for dev X" and "best devs for job Y" are each one range scan
+				db.Index('ix_dev_position_match_dev_score', 'dev_id', 'score', 'pos_id'),
+				db.Index('ix_dev_position_match_pos_score', 'pos_id', 'score', 'dev_id')
+				)
+
+# durable background job queue - see job_queue.py
+jobs_table = db.Table('jobs',
+				db.Column('id', db.Integer, primary_key=True),
+				db.Column('kind', db.String(50), nullable=False),
+				db.Column('payload', db.Text, nullable=False),
+				db.Column('status', db.String(10), nullable=False),
+				db.Column('attempts', db.Integer, nullable=False),
+				db.Column('max_attempts', db.Integer, nullable=False),
+				db.Column('run_after', db.DateTime, nullable=False),
+				db.Column('locked_by', db.String(100)),
+				db.Column('locked_until', db.DateTime),
+				db.Column('last_error', db.Text),
+				db.Column('created_at', db.DateTime, nullable=False),
+				db.Column('started_at', db.DateTime),
+				db.Column('finished_at', db.DateTime),
+				# workers look for the oldest due job of a status
+				db.Index('ix_jobs_status_run_after', 'status', 'run_after')
+				)
+
+# a dev's inbox - "new position matching your skills"
+notifications_table = db.Table('notifications',
+				db.Column('id', db.Integer, primary_key=True),
+				db.Column('dev_id', db.Integer, db.ForeignKey('devs.id'), nullable=False),
+				db.Column('pos_id', db.Integer, db.ForeignKey('positions.id'), nullable=False),
+				db.Column('created_at', db.DateTime, nullable=False),
+				db.Column('read_at', db.DateTime),
+				db.Index('ix_notifications_dev_id', 'dev_id', 'id'),
+				# one notification per dev per position, which also makes fan-out retries safe
+				db.Index('ix_notifications_pos_dev', 'pos_id', 'dev_id', unique=True)
+				)
+
+# closed positions moved off the live tables by 'flask compact-positions' - see position_archive.py
+positions_archive_table = db.Table('positions_archive',
+				db.Column('id', db.Integer, primary_key=True, autoincrement=False),
+				db.Column('org', db.Integer, db.ForeignKey('orgs.id'), nullable=False),
+				db.Column('name', db.String(255)),
+				db.Column('description', db.Text),
+				db.Column('status', db.String(10), nullable=False),
+				db.Column('expires_at', db.DateTime),
+				db.Column('date_created', db.DateTime),
+				db.Column('date_updated', db.DateTime),
+				db.Column('archived_at', db.DateTime, nullable=False),
+				# an org's history, newest first
+				db.Index('ix_positions_archive_org_id', 'org', 'id')
+				)
+position_langs_archive_table = db.Table('position_langs_archive',
+				db.Column('pos_id', db.Integer, db.ForeignKey('positions_archive.id'), primary_key=True),
+				db.Column('lang_id', db.Integer, db.ForeignKey('langs.id'), primary_key=True)
+				)
+position_frame_lib_archive_table = db.Table('position_frame_lib_archive',
+				db.Column('pos_id', db.Integer, db.ForeignKey('positions_archive.id'), primary_key=True),
+				db.Column('framelib_id', db.Integer, db.ForeignKey('framelib.id'), primary_key=True)
+				)
+
+class Dev(db.Model):	
+	__tablename__ = "devs"
+	id = db.Column(db.Integer, primary_key=True)
+	first_name = db.Column(db.String(255))
+	last_name = db.Column(db.String(255))
+	email = db.Column(db.String(255), unique=True, index=True)
+	password = db.Column(db.String(255))
+	address = db.Column(db.String(255))
+	address_2 = db.Column(db.String(255))
+	address_city = db.Column(db.String(255))
+	address_state = db.Column(db.Integer)
+	# geocoded from city/state - see geo.py
+	lat = db.Column(db.Float)
+	lon = db.Column(db.Float)
+	geo_cell = db.Column(db.Integer, index=True)
+	profile_bio = db.Column(db.Text)
+	status = db.Column(db.Integer)
+	date_created = db.Column(db.DateTime, server_default=func.now())    
+	# indexed for the facet index catch-up - see facets.py
+	date_updated = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), index=True)
+	devs_skills_langs = db.relationship('Language', secondary=dev_lang_table)
+	devs_skills_frame_lib = db.relationship('FrameLib', secondary=dev_frame_lib_table)
+
+class Org(db.Model):	
+	__tablename__ = "orgs"
+	id = db.Column(db.Integer, primary_key=True)
+	positions = db.relationship('Position', backref='orgs_pos')
+	org_name = db.Column(db.String(255))
+	rep_name = db.Column(db.String(255))
+	email = db.Column(db.String(255), unique=True, index=True)
+	password = db.Column(db.String(255))
+	address = db.Column(db.String(255))
+	address_2 = db.Column(db.String(255))
+	address_city = db.Column(db.String(255))
+	address_state = db.Column(db.String(50))
+	lat = db.Column(db.Float)
+	lon = db.Column(db.Float)
+	geo_cell = db.Column(db.Integer, index=True)
+	date_created = db.Column(db.DateTime, server_default=func.now())    
+	date_updated = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
+
+class Position(db.Model):	
+	__tablename__ = "positions"
+	# AUTOINCREMENT: ids of compacted positions live on in positions_archive and in links to their archived pages, so they are never handed out again (their inbox rows are deleted with them)
+	__table_args__ = {'sqlite_autoincrement': True}
+	id = db.Column(db.Integer, primary_key=True)
+	org = db.Column(db.Integer, db.ForeignKey('orgs.id'), nullable=False, index=True)
+	name = db.Column(db.String(255))
+	description = db.Column(db.Text)
+	# open / filled / expired - only open positions are matched, listed and searched
+	status = db.Column(db.String(10), nullable=False, default=position_archive.OPEN, server_default=position_archive.OPEN, index=True)
+	expires_at = db.Column(db.DateTime, index=True)
+	date_created = db.Column(db.DateTime, server_default=func.now())    
+	date_updated = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
+	pos_skills_langs = db.relationship('Language', secondary=pos_lang_table)
+	pos_skills_frame_lib = db.relationship('FrameLib', secondary=pos_frame_lib_table)
+
+class Language(db.Model):	
+	__tablename__ = "langs"
+	id = db.Column(db.Integer, primary_key=True)
+	name = db.Column(db.String(50))
+	img = db.Column(db.String(255))
+
+class FrameLib(db.Model):	
+	__tablename__ = "framelib"
+	id = db.Column(db.Integer, primary_key=True)
+	name = db.Column(db.String(50))
+	img = db.Column(db.String(255))
+
+class State(db.Model):	
+	__tablename__ = "states"
+	id = db.Column(db.Integer, primary_key=True)
+	name = db.Column(db.String(50))
+	abbrev = db.Column(db.String(4))
@@ -0,0 +1,53 @@
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import select, and_
+
+# "A new job matches your skills" fan-out, run by the background worker.
+# Matching devs come from dev_position_match, one indexed read; inbox rows are
+# then written chunk_size at a time, one transaction per chunk, so the
+# writer lock is never held for long.  Devs already notified about the
+# position are skipped, which makes a retried job pick up where it stopped.
+# With a spool directory, each chunk's emails are also written there as one
+# JSON Lines file for whatever mail relay picks them up.
+
+
+def notify_position_matches(session, tables, pos_id, chunk_size=500, spool_dir=None):
+	match = tables['dev_position_match']
+	notes = tables['notifications']
+	dev_ids = session.execute(select(match.c.dev_id).where(match.c.pos_id == pos_id).order_by(match.c.dev_id)).scalars().all()
+	position = session.execute(select(tables['positions'].c.name).where(tables['positions'].c.id == pos_id)).first()
+	if position is None:
+		return 0
+
+	written = 0
+	for start in range(0, len(dev_ids), chunk_size):
+		chunk = dev_ids[start:start + chunk_size]
+		done = set(session.execute(select(notes.c.dev_id).where(and_(notes.c.pos_id == pos_id, notes.c.dev_id.in_(chunk)))).scalars())
+		fresh = [dev_id for dev_id in chunk if dev_id not in done]
+		if not fresh:
+			continue
+		now = datetime.utcnow()
+		session.execute(notes.insert(), [{'dev_id': dev_id, 'pos_id': pos_id, 'created_at': now} for dev_id in fresh])
+		if spool_dir:
+			spool_chunk(session, tables, spool_dir, pos_id, position.name, fresh)
+		session.commit()
+		written += len(fresh)
+	return written
+
+
+# the file is named after the chunk, so a retried chunk overwrites rather than duplicates
+def spool_chunk(session, tables, spool_dir, pos_id, pos_name, dev_ids):
+	devs = tables['devs']
+	if not os.path.isdir(spool_dir):
+		os.makedirs(spool_dir)
+	path = os.path.join(spool_dir, 'pos%d-dev%d.jsonl' % (pos_id, dev_ids[0]))
+	with open(path + '.tmp', 'w') as spool:
+		for dev_id, email, first_name in session.execute(select(devs.c.id, devs.c.email, devs.c.first_name).where(devs.c.id.in_(dev_ids))):
+			spool.write(json.dumps({
+				'to': email,
+				'subject': "New job match: %s" % pos_name,
+				'body': "Hi %s, a new position matching your skills was just posted: %s\n/orgs/jobs/%d" % (first_name, pos_name, pos_id),
+			}) + '\n')
+	os.replace(path + '.tmp', path)
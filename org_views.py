@@ -0,0 +1,240 @@
+from datetime import datetime
+from types import SimpleNamespace
+from urllib.parse import urlencode
+
+from flask import Blueprint, current_app, render_template, redirect, request, session, flash, abort, make_response
+from sqlalchemy.sql import func
+from sqlalchemy.orm import load_only
+
+import facets
+import job_queue
+import match_table
+import position_archive
+from extensions import refdata, facet_index, skill_index_file
+from models import db, Dev, Org, Position, Language, FrameLib, pos_lang_table, pos_frame_lib_table, positions_archive_table
+from skill_service import sync_skills
+from view_helpers import dev_cards, lazy_cards, stream_page, page_validators, not_modified, conditional_headers
+
+orgs = Blueprint('orgs', __name__)
+
+
+############################################
+## VALIDATE FORM DATA and CREATE POSITION ##
+############################################
+# shared with 'flask import-positions' so both paths accept the same postings
+def validate_position(name, description):
+	errors = []
+	if len(name) < 2:
+		errors.append("The Job title must be at least 2 characters long.")
+	if len(description) < 15:
+		errors.append("Your description must be at least 15 characters long.")
+	return errors
+
+
+@orgs.route('/orgs/jobs/create', methods=['POST'])
+def create_position():
+	if 'userid' not in session:
+		return redirect('/')
+	elif session['acct_type'] != 'org':
+		return redirect('/')
+
+	is_valid = True
+
+	for message in validate_position(request.form['pos_name'], request.form['pos_desc']):
+		flash(message, 'reg_error')
+		is_valid = False
+
+	# optional closing date - the position expires at the start of that day
+	expires_at = None
+	if request.form.get('pos_expires'):
+		try:
+			expires_at = datetime.strptime(request.form['pos_expires'], '%Y-%m-%d')
+		except ValueError:
+			flash("Closing date is not a valid date.", 'reg_error')
+			is_valid = False
+		else:
+			if expires_at <= datetime.utcnow():
+				flash("Closing date must be in the future.", 'reg_error')
+				is_valid = False
+
+	# Record data and flash success
+	if is_valid:
+		new_instance_of_pos = Position(org=session['userid'], name=request.form['pos_name'], description=request.form['pos_desc'], expires_at=expires_at)
+		db.session.add(new_instance_of_pos)
+		db.session.flush()		# assigns the id without committing
+
+		# position row and both skill sets go in as one transaction
+		sync_skills(db.session, pos_lang_table, 'pos_id', new_instance_of_pos.id, 'lang_id', Language.__table__, request.form.getlist('dev_lang_input'), owner_table=Position.__table__)
+		sync_skills(db.session, pos_frame_lib_table, 'pos_id', new_instance_of_pos.id, 'framelib_id', FrameLib.__table__, request.form.getlist('dev_framework_input'), owner_table=Position.__table__)
+		match_table.refresh_positions(db.session, db.metadata.tables, [new_instance_of_pos.id])
+		# matching devs are notified by the background worker, not on this request
+		job_queue.enqueue(db.session, db.metadata.tables, 'notify_matches', {'pos_id': new_instance_of_pos.id})
+		db.session.commit()
+
+		return redirect('/orgs/dashboard')
+
+	return redirect('/orgs/jobs/new')
+
+
+#######################
+## NEW POSITION FORM ##
+#######################
+@orgs.route('/orgs/jobs/new')
+def new_position():
+	if 'userid' not in session:
+		return redirect('/')
+	elif session['acct_type'] != 'org':
+		return redirect('/')
+
+	cur_org = Org.query.get(session['userid'])
+	langs_list = refdata.get().langs
+	frmwrk_list = refdata.get().frame_libs
+
+	return render_template('org_position.html', cur_org=cur_org, all_langs=langs_list, all_frmwrks=frmwrk_list)
+
+
+def open_positions(org_id):
+	return Position.query.options(load_only(Position.id, Position.name)).filter(Position.org == org_id, Position.status == position_archive.OPEN).order_by(Position.id).all()
+
+
+####################
+## ORGS DASHBOARD ##
+####################
+@orgs.route('/orgs/dashboard')
+def orgs_dashboard():
+	if 'userid' not in session:
+		return redirect('/')
+
+	cur_org = Org.query.get(session['userid'])
+
+	# facet filters: any of the chosen values within a facet (all of them for skills with
+	# match=all), every facet at once; counts for each value come back from the same pass
+	selection = {'lang': request.args.getlist('lang', type=int), 'frame_lib': request.args.getlist('fw', type=int), 'state': request.args.getlist('state', type=int)}
+	match_all = request.args.get('match') == 'all'
+	facets.sync(db.session, db.metadata.tables, facet_index, skill_index_file.current())
+	matched, counts = facet_index.search(selection, match_all)
+
+	# one page of ids by keyset over the matching set; only devs whose card isn't cached get loaded and rendered
+	page_ids, prev_cursor, next_cursor = facets.page(matched, current_app.config['DEVS_PAGE_SIZE'], after=request.args.get('after', type=int), before=request.args.get('before', type=int))
+	def page_stamps():
+		stamps = dict(db.session.query(Dev.id, Dev.date_updated).filter(Dev.id.in_(page_ids)))
+		return [(dev_id, stamps[dev_id]) for dev_id in page_ids if dev_id in stamps]
+	cards = lazy_cards(dev_cards, page_stamps)
+
+	ref = refdata.get()
+	facet_groups = []
+	for facet, param, label, rows in (('lang', 'lang', 'Languages', ref.langs), ('frame_lib', 'fw', 'Frameworks & Libraries', ref.frame_libs), ('state', 'state', 'State', ref.states)):
+		# values nobody has are left out unless already ticked
+		options = [(row, counts[facet].get(row.id, 0), row.id in selection[facet]) for row in rows if counts[facet].get(row.id) or row.id in selection[facet]]
+		facet_groups.append((param, label, options))
+	filter_args = [('lang', value) for value in selection['lang']] + [('fw', value) for value in selection['frame_lib']] + [('state', value) for value in selection['state']]
+	if match_all:
+		filter_args.append(('match', 'all'))
+
+	return stream_page("orgs_dashboard.html", cur_org=cur_org, dev_cards=cards, prev_cursor=prev_cursor, next_cursor=next_cursor,
+		pos_to_fill=open_positions(cur_org.id), past_positions=position_archive.history(db.session, db.metadata.tables, cur_org.id, current_app.config['POSITION_HISTORY_LIMIT']),
+		facet_groups=facet_groups, match_all=match_all, match_count=facets.popcount(matched), filter_query=urlencode(filter_args), filtered=any(selection.values()))
+
+
+#######################
+## VIEW ORGS PROFILE ##
+#######################
+@orgs.route('/orgs/profile/<org_id>')
+def orgs_profile(org_id):
+	if 'userid' not in session:
+		return redirect('/')
+
+	if int(session['userid']) == int(org_id):
+		return redirect('/orgs/dashboard')
+
+	# the org row plus its newest/count of positions, so adding, closing or archiving one invalidates
+	org_updated = db.session.query(Org.date_updated).filter(Org.id == org_id).scalar()
+	pos_updated, pos_count = db.session.query(func.max(Position.date_updated), func.count(Position.id)).filter(Position.org == org_id).one()
+	archived_count = db.session.query(func.count()).select_from(positions_archive_table).filter(positions_archive_table.c.org == org_id).scalar()
+	etag, last_modified = page_validators(org_updated, pos_updated, pos_count, archived_count)
+	cached = not_modified(etag, last_modified)
+	if cached:
+		return cached
+
+	cur_org = Org.query.get(org_id)
+	# all_devs = Dev.query.all()
+
+	response = make_response(render_template("orgs_dashboard.html", cur_org=cur_org, pos_to_fill=open_positions(cur_org.id),
+		past_positions=position_archive.history(db.session, db.metadata.tables, cur_org.id, current_app.config['POSITION_HISTORY_LIMIT'])))
+	return conditional_headers(response, etag, last_modified)
+	# all_devs=all_devs, 
+
+
+######################
+## VIEW JOB POSTING ##
+######################
+@orgs.route('/orgs/jobs/<pos_id>')
+def view_position(pos_id):
+	if 'userid' not in session:
+		return redirect('/')
+
+	viewer_model = Dev if session['acct_type'] == 'dev' else Org
+	pos_stamp = db.session.query(Position.org, Position.date_updated, Position.status).filter(Position.id == pos_id).first()
+	archived = None
+	if pos_stamp is None:
+		# compacted away - the org's history still links here, so serve it from the archive
+		archived = position_archive.load(db.session, db.metadata.tables, pos_id)
+		if archived is None:
+			abort(404)
+		pos_stamp = SimpleNamespace(org=archived['org'], date_updated=archived['archived_at'], status=archived['status'])
+	# the posting org's view lists live candidates, so only other viewers get validators
+	is_owner = session['acct_type'] == 'org' and pos_stamp.org == int(session['userid'])
+	if not is_owner:
+		# the nav shows the viewer's name, so their row counts too
+		etag, last_modified = page_validators(pos_stamp.date_updated,
+			db.session.query(Org.date_updated).filter(Org.id == pos_stamp.org).scalar(),
+			db.session.query(viewer_model.date_updated).filter(viewer_model.id == session['userid']).scalar())
+		cached = not_modified(etag, last_modified)
+		if cached:
+			return cached
+
+	cur_user = viewer_model.query.get(session['userid'])
+	if archived is None:
+		cur_pos = Position.query.get(pos_id)
+	else:
+		ref = refdata.get()
+		cur_pos = SimpleNamespace(pos_skills_langs=[ref.langs_by_id[lang_id] for lang_id in archived['lang_ids'] if lang_id in ref.langs_by_id],
+			pos_skills_frame_lib=[ref.frame_libs_by_id[frame_id] for frame_id in archived['frame_lib_ids'] if frame_id in ref.frame_libs_by_id], **archived)
+	cur_org = Org.query.get(cur_pos.org)
+
+	# the posting org also sees a shortlist of every dev sharing a skill, best overlap first,
+	# paged by (score, dev id) - see match_table.shortlist
+	candidates = []
+	next_cursor = None
+	after = None
+	if is_owner and cur_pos.status == position_archive.OPEN:
+		if request.args.get('score', type=int) is not None and request.args.get('after', type=int) is not None:
+			after = (request.args.get('score', type=int), request.args.get('after', type=int))
+		ranked, next_cursor = match_table.shortlist(db.session, db.metadata.tables, cur_pos.id, current_app.config['SHORTLIST_PAGE_SIZE'], after=after)
+		if ranked:
+			stamps = dict(db.session.query(Dev.id, Dev.date_updated).filter(Dev.id.in_([row.dev_id for row in ranked])))
+			ranked = [row for row in ranked if row.dev_id in stamps]
+			candidates = list(zip(dev_cards([(row.dev_id, stamps[row.dev_id]) for row in ranked]), ranked))
+
+	response = make_response(render_template("job_post.html", cur_job=cur_pos, cur_org=cur_org, cur_user=cur_user, candidates=candidates, shortlist_next=next_cursor, shortlist_paged=after is not None))
+	if not is_owner:
+		response = conditional_headers(response, etag, last_modified)
+	return response
+
+
+#########################
+## MARK POSITION FILLED ##
+#########################
+@orgs.route('/orgs/jobs/<pos_id>/fill', methods=['POST'])
+def fill_position(pos_id):
+	if 'userid' not in session or session['acct_type'] != 'org':
+		return redirect('/')
+
+	cur_pos = Position.query.get(pos_id)
+	if cur_pos is None or cur_pos.org != int(session['userid']) or cur_pos.status != position_archive.OPEN:
+		return redirect('/orgs/dashboard')
+
+	# drops out of matching and the live lists now; 'flask compact-positions' archives it later
+	position_archive.close_positions(db.session, db.metadata.tables, [cur_pos.id], position_archive.FILLED)
+	db.session.commit()
+	return redirect('/orgs/jobs/%d' % cur_pos.id)
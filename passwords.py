@@ -0,0 +1,78 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+# Password hashing off the request thread.
+# bcrypt releases the GIL while it works, so a small dedicated pool lets the
+# CPU-bound hashing run next to the request threads instead of blocking them.
+# The number of outstanding jobs is capped; past the cap callers get
+# HasherBusy straight away rather than queueing behind a login spike.
+
+
+class HasherBusy(Exception):
+	pass
+
+
+def hash_cost(pw_hash):
+	if isinstance(pw_hash, bytes):
+		pw_hash = pw_hash.decode('utf-8', 'replace')
+	try:
+		return int(pw_hash.split('$')[2])
+	except (AttributeError, IndexError, ValueError):
+		return None
+
+
+class PasswordHasher(object):
+
+	def __init__(self, bcrypt, rounds=12, max_workers=2, max_pending=32, timeout=10.0):
+		self.bcrypt = bcrypt
+		self.rounds = rounds
+		self.max_workers = max_workers
+		self.max_pending = max_pending
+		self.timeout = timeout
+		self._slots = threading.BoundedSemaphore(max_pending)
+		self._executor = None
+		self._executor_lock = threading.Lock()
+		self._count_lock = threading.Lock()
+		self.pending = 0
+		self.rejected = 0
+
+	# the pool is created on first use so forked workers each get their own threads
+	def _get_executor(self):
+		if self._executor is None:
+			with self._executor_lock:
+				if self._executor is None:
+					self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bcrypt')
+		return self._executor
+
+	def _run(self, fn, *args):
+		if not self._slots.acquire(False):
+			with self._count_lock:
+				self.rejected += 1
+			raise HasherBusy()
+		with self._count_lock:
+			self.pending += 1
+		try:
+			future = self._get_executor().submit(fn, *args)
+		except Exception:
+			self._release(None)
+			raise
+		future.add_done_callback(self._release)
+		try:
+			return future.result(self.timeout)
+		except TimeoutError:
+			raise HasherBusy()
+
+	def _release(self, future):
+		with self._count_lock:
+			self.pending -= 1
+		self._slots.release()
+
+	def hash(self, password):
+		return self._run(self.bcrypt.generate_password_hash, password, self.rounds)
+
+	def check(self, pw_hash, password):
+		return self._run(self.bcrypt.check_password_hash, pw_hash, password)
+
+	# true when a stored hash was made with a different work factor than the configured one
+	def needs_rehash(self, pw_hash):
+		return hash_cost(pw_hash) != self.rounds
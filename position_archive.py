@@ -0,0 +1,90 @@
+from datetime import datetime
+
+from sqlalchemy import select, literal, union_all, and_
+
+# Position lifecycle: open -> filled | expired -> archived.
+# Only open positions take part in matching, the dashboards and search.  A
+# position closes when its org marks it filled or when expires_at passes
+# (expire_due); its match rows go at once so it drops out of every ranking.
+# compact() then moves closed positions and their skill rows into the
+# *_archive tables in batches, one transaction per batch, so the live tables
+# and their indexes only hold what is still being hired for.  Inbox entries
+# for an archived position are dropped with it; the org's history reads the
+# archive.
+
+OPEN = 'open'
+FILLED = 'filled'
+EXPIRED = 'expired'
+CLOSED = (FILLED, EXPIRED)
+
+POSITION_COLUMNS = ('id', 'org', 'name', 'description', 'status', 'expires_at', 'date_created', 'date_updated')
+
+
+def close_positions(session, tables, pos_ids, status, now=None):
+	pos_ids = list(pos_ids)
+	if not pos_ids:
+		return
+	positions = tables['positions']
+	session.execute(positions.update().where(positions.c.id.in_(pos_ids)).values(status=status, date_updated=now or datetime.utcnow()))
+	session.execute(tables['dev_position_match'].delete().where(tables['dev_position_match'].c.pos_id.in_(pos_ids)))
+
+
+# returns the ids that just expired; the caller commits
+def expire_due(session, tables, now=None):
+	now = now or datetime.utcnow()
+	positions = tables['positions']
+	due = session.execute(select(positions.c.id).where(and_(positions.c.status == OPEN, positions.c.expires_at <= now))).scalars().all()
+	close_positions(session, tables, due, EXPIRED, now)
+	return due
+
+
+def compact(session, tables, batch_size=500, echo=None):
+	positions = tables['positions']
+	archived = 0
+	while True:
+		pos_ids = session.execute(select(positions.c.id).where(positions.c.status.in_(CLOSED)).order_by(positions.c.id).limit(batch_size)).scalars().all()
+		if not pos_ids:
+			return archived
+		move_batch(session, tables, pos_ids, datetime.utcnow())
+		session.commit()
+		archived += len(pos_ids)
+		if echo:
+			echo("archived %d positions (up to id %d)" % (archived, pos_ids[-1]))
+
+
+def move_batch(session, tables, pos_ids, now):
+	positions = tables['positions']
+	columns = [positions.c[name] for name in POSITION_COLUMNS]
+	session.execute(tables['positions_archive'].insert().from_select(list(POSITION_COLUMNS) + ['archived_at'],
+		select(*columns, literal(now).label('archived_at')).where(positions.c.id.in_(pos_ids))))
+	for live, archive, skill_col in (('position_langs', 'position_langs_archive', 'lang_id'), ('position_frame_lib', 'position_frame_lib_archive', 'framelib_id')):
+		source = tables[live]
+		session.execute(tables[archive].insert().from_select(['pos_id', skill_col],
+			select(source.c.pos_id, source.c[skill_col]).where(source.c.pos_id.in_(pos_ids))))
+		session.execute(source.delete().where(source.c.pos_id.in_(pos_ids)))
+	for dependent in ('dev_position_match', 'notifications'):
+		session.execute(tables[dependent].delete().where(tables[dependent].c.pos_id.in_(pos_ids)))
+	session.execute(positions.delete().where(positions.c.id.in_(pos_ids)))
+
+
+# an org's closed positions, live-but-closed and archived together, newest first
+def history(session, tables, org_id, limit):
+	positions, archive = tables['positions'], tables['positions_archive']
+	closed = select(positions.c.id, positions.c.name, positions.c.status, positions.c.date_updated) \
+		.where(and_(positions.c.org == org_id, positions.c.status.in_(CLOSED)))
+	moved = select(archive.c.id, archive.c.name, archive.c.status, archive.c.date_updated).where(archive.c.org == org_id)
+	both = union_all(closed, moved).subquery('history')
+	return session.execute(select(both).order_by(both.c.id.desc()).limit(limit)).fetchall()
+
+
+# an archived position as a dict of its columns plus lang_ids / frame_lib_ids, or None
+def load(session, tables, pos_id):
+	archive = tables['positions_archive']
+	row = session.execute(select(archive).where(archive.c.id == pos_id)).first()
+	if row is None:
+		return None
+	found = dict(row._mapping)
+	langs, frame_libs = tables['position_langs_archive'], tables['position_frame_lib_archive']
+	found['lang_ids'] = session.execute(select(langs.c.lang_id).where(langs.c.pos_id == pos_id)).scalars().all()
+	found['frame_lib_ids'] = session.execute(select(frame_libs.c.framelib_id).where(frame_libs.c.pos_id == pos_id)).scalars().all()
+	return found
@@ -0,0 +1,163 @@
+import csv
+import json
+import os
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+# Bulk import of positions for one org - see 'flask import-positions'.
+# Rows are read from CSV or JSON Lines, validated with the same rules as the
+# /orgs/jobs/create form, and written a chunk per transaction: one
+# multi-row INSERT ... RETURNING for the positions, then executemany for
+# position_langs / position_frame_lib.  A bad row is reported and skipped;
+# if a chunk fails in the database it is retried row by row so only the
+# offending rows are lost.  on_written(pos_ids) runs inside each chunk's
+# transaction, just before it commits, for work that must land with the rows.
+
+CSV_SKILL_SEPARATOR = ';'
+
+
+class ImportReport(object):
+
+	def __init__(self):
+		self.imported = 0
+		self.errors = []		# (line number, message)
+		self.started = time.time()
+
+	@property
+	def elapsed(self):
+		return time.time() - self.started
+
+	@property
+	def rows_per_sec(self):
+		return self.imported / self.elapsed if self.elapsed else 0.0
+
+
+def read_rows(path):
+	ext = os.path.splitext(path)[1].lower()
+	with open(path, newline='') as source:
+		if ext == '.csv':
+			# header is line 1, so data starts at line 2
+			for line_no, row in enumerate(csv.DictReader(source), 2):
+				yield line_no, row
+		else:
+			for line_no, line in enumerate(source, 1):
+				if line.strip():
+					try:
+						yield line_no, json.loads(line)
+					except ValueError as err:
+						yield line_no, err
+
+
+# JSON rows can carry any type; a field that is not text (or a list of text for skills) is a problem for the row, not the import
+def text_field(row, key, problems):
+	value = row.get(key)
+	if value is None:
+		return ''
+	if not isinstance(value, str):
+		problems.append("%s must be text, not %s" % (key, type(value).__name__))
+		return ''
+	return value.strip()
+
+
+def split_names(row, key, problems):
+	value = row.get(key)
+	if value is None:
+		return []
+	if isinstance(value, str):
+		value = value.split(CSV_SKILL_SEPARATOR) if CSV_SKILL_SEPARATOR in value else value.split(',')
+	elif not isinstance(value, list) or not all(isinstance(name, str) for name in value):
+		problems.append("%s must be a list of names" % key)
+		return []
+	return [name.strip() for name in value if name.strip()]
+
+
+def name_map(rows):
+	return dict((row.name.lower(), row.id) for row in rows)
+
+
+# returns (position values, lang ids, framework ids) or raises ValueError with every problem found
+def prepare_row(row, org_id, validate, lang_ids_by_name, frame_lib_ids_by_name):
+	if not isinstance(row, dict):
+		raise ValueError("not a JSON object: %s" % row)
+	problems = []
+	name = text_field(row, 'name', problems)
+	description = text_field(row, 'description', problems)
+	problems.extend(validate(name, description))
+
+	lang_ids = []
+	for lang in split_names(row, 'languages', problems):
+		if lang.lower() in lang_ids_by_name:
+			lang_ids.append(lang_ids_by_name[lang.lower()])
+		else:
+			problems.append("unknown language '%s'" % lang)
+	frame_lib_ids = []
+	for frame_lib in split_names(row, 'frameworks', problems):
+		if frame_lib.lower() in frame_lib_ids_by_name:
+			frame_lib_ids.append(frame_lib_ids_by_name[frame_lib.lower()])
+		else:
+			problems.append("unknown framework '%s'" % frame_lib)
+
+	if problems:
+		raise ValueError('; '.join(problems))
+	return {'org': org_id, 'name': name, 'description': description}, sorted(set(lang_ids)), sorted(set(frame_lib_ids))
+
+
+def write_chunk(session, tables, chunk):
+	positions = tables['positions']
+	pos_ids = session.execute(insert(positions).returning(positions.c.id, sort_by_parameter_order=True), [values for line_no, values, langs, frame_libs in chunk]).scalars().all()
+
+	lang_rows = []
+	frame_lib_rows = []
+	for pos_id, (line_no, values, lang_ids, frame_lib_ids) in zip(pos_ids, chunk):
+		lang_rows.extend({'pos_id': pos_id, 'lang_id': lang_id} for lang_id in lang_ids)
+		frame_lib_rows.extend({'pos_id': pos_id, 'framelib_id': frame_lib_id} for frame_lib_id in frame_lib_ids)
+	if lang_rows:
+		session.execute(tables['position_langs'].insert(), lang_rows)
+	if frame_lib_rows:
+		session.execute(tables['position_frame_lib'].insert(), frame_lib_rows)
+	return pos_ids
+
+
+def flush_chunk(session, tables, chunk, report, on_written):
+	try:
+		pos_ids = write_chunk(session, tables, chunk)
+		on_written(pos_ids)
+		session.commit()
+	except SQLAlchemyError:
+		session.rollback()
+		if len(chunk) == 1:
+			report.errors.append((chunk[0][0], "database rejected the row"))
+			return
+		for single in chunk:
+			flush_chunk(session, tables, [single], report, on_written)
+		return
+
+	report.imported += len(pos_ids)
+
+
+def import_positions(session, tables, path, org_id, validate, refdata, chunk_size=500, on_written=None):
+	report = ImportReport()
+	on_written = on_written or (lambda pos_ids: None)
+	lang_ids_by_name = name_map(refdata.langs)
+	frame_lib_ids_by_name = name_map(refdata.frame_libs)
+
+	chunk = []
+	for line_no, row in read_rows(path):
+		if isinstance(row, Exception):
+			report.errors.append((line_no, "invalid JSON: %s" % row))
+			continue
+		try:
+			values, lang_ids, frame_lib_ids = prepare_row(row, org_id, validate, lang_ids_by_name, frame_lib_ids_by_name)
+		except ValueError as err:
+			report.errors.append((line_no, str(err)))
+			continue
+		chunk.append((line_no, values, lang_ids, frame_lib_ids))
+		if len(chunk) >= chunk_size:
+			flush_chunk(session, tables, chunk, report, on_written)
+			chunk = []
+	if chunk:
+		flush_chunk(session, tables, chunk, report, on_written)
+
+	return report
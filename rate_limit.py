@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+# Token buckets for the password routes (login and signup POSTs).
+# A bucket holds up to `burst` tokens and refills at burst/per tokens a
+# second; every attempt takes one, and an empty bucket means "429, try again
+# in retry_after seconds".  Buckets are keyed on client IP and on the email
+# being tried, so one address can't spray many accounts and many addresses
+# can't grind on one account.
+#
+# State lives in a small SQLite file so every worker process on the host
+# shares the same buckets.  A take is a single UPSERT ... RETURNING, which
+# SQLite applies atomically, so there is no read-modify-write race between
+# workers.  The file holds nothing worth keeping across a crash, so it runs
+# with synchronous=OFF.  If the store itself fails (locked past the timeout,
+# disk trouble) the attempt is let through and counted - the bcrypt pool's
+# own cap (passwords.py) still bounds the damage.
+
+PRUNE_EVERY = 1000		# takes between sweeps of buckets that have refilled completely
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+	key TEXT PRIMARY KEY,
+	tokens REAL NOT NULL,
+	updated REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+# refill, then take one token only if there is one - no row back means rejected
+TAKE = """
+INSERT INTO buckets (key, tokens, updated) VALUES (:key, :burst - 1, :now)
+ON CONFLICT (key) DO UPDATE SET
+	tokens = min(:burst, tokens + (:now - updated) * :rate) - 1,
+	updated = :now
+WHERE min(:burst, tokens + (:now - updated) * :rate) >= 1
+RETURNING tokens
+"""
+
+
+class RateLimiter(object):
+
+	def __init__(self, path, timeout=0.5):
+		self.path = path
+		self.timeout = timeout
+		self._local = threading.local()
+		self._lock = threading.Lock()
+		self.counts = Counter()		# (rule, outcome) -> attempts
+		self._takes = 0
+		self._longest = 0.0
+
+	# one connection per thread, opened lazily so forked workers get their own
+	def _conn(self):
+		conn = getattr(self._local, 'conn', None)
+		if conn is None:
+			directory = os.path.dirname(self.path)
+			if directory and not os.path.isdir(directory):
+				os.makedirs(directory)
+			conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+			conn.execute("PRAGMA journal_mode=WAL")
+			conn.execute("PRAGMA synchronous=OFF")
+			conn.execute(SCHEMA)
+			self._local.conn = conn
+		return conn
+
+	def record(self, rule, outcome):
+		with self._lock:
+			self.counts[(rule, outcome)] += 1
+
+	# returns seconds to wait, or 0 when the attempt may go ahead
+	def take(self, rule, key, burst, per):
+		rate = float(burst) / per
+		now = time.time()
+		try:
+			conn = self._conn()
+			row = conn.execute(TAKE, {'key': '%s:%s' % (rule, key), 'burst': burst, 'rate': rate, 'now': now}).fetchone()
+			if row is None:
+				tokens, updated = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", ('%s:%s' % (rule, key),)).fetchone()
+				self.record(rule, 'rejected')
+				return max((1 - min(burst, tokens + (now - updated) * rate)) / rate, 0.001)
+			self._maybe_prune(conn, now, per)
+		except sqlite3.Error:
+			self.record(rule, 'store_error')
+			return 0
+		self.record(rule, 'allowed')
+		return 0
+
+	def _maybe_prune(self, conn, now, per):
+		with self._lock:
+			self._takes += 1
+			self._longest = max(self._longest, per)
+			if self._takes % PRUNE_EVERY:
+				return
+			horizon = self._longest
+		# a bucket untouched for a whole period is full again, the same as no row
+		conn.execute("DELETE FROM buckets WHERE updated < ?", (now - horizon,))
@@ -0,0 +1,87 @@
+import os
+import threading
+from collections import namedtuple
+
+# Read-through cache for the lookup tables (langs, framelib, states).
+# These change maybe once a year, so every worker keeps a snapshot in memory
+# and only goes back to the database after an invalidation.  Invalidation is
+# signalled two ways: in-process by bumping the version, and across worker
+# processes by touching a stamp file whose mtime every worker compares on
+# access (a stat() call, not a database round trip).
+
+RefRow = namedtuple('RefRow', ['id', 'name', 'img'])
+StateRow = namedtuple('StateRow', ['id', 'name', 'abbrev'])
+
+
+class RefData(object):
+
+	def __init__(self, version, langs, frame_libs, states):
+		self.version = version
+		self.langs = langs
+		self.frame_libs = frame_libs
+		self.states = states
+		self.langs_by_id = dict((row.id, row) for row in langs)
+		self.frame_libs_by_id = dict((row.id, row) for row in frame_libs)
+		self.states_by_id = dict((row.id, row) for row in states)
+
+	def state(self, state_id):
+		try:
+			return self.states_by_id.get(int(state_id))
+		except (TypeError, ValueError):
+			return None
+
+
+class RefDataCache(object):
+
+	# loader() must return (langs, frame_libs, states) as lists of RefRow / StateRow
+	def __init__(self, loader, stamp_file=None):
+		self._loader = loader
+		self._lock = threading.Lock()
+		self._data = None
+		self._stamp_mtime = None
+		self.stamp_file = stamp_file
+		self.version = 0
+
+	def _read_stamp(self):
+		if not self.stamp_file:
+			return None
+		try:
+			return os.stat(self.stamp_file).st_mtime_ns
+		except OSError:
+			return None
+
+	def get(self):
+		data = self._data
+		stamp = self._read_stamp()
+		if data is not None and stamp == self._stamp_mtime:
+			return data
+
+		with self._lock:
+			if self._data is None or stamp != self._stamp_mtime:
+				langs, frame_libs, states = self._loader()
+				self.version += 1
+				self._data = RefData(self.version, langs, frame_libs, states)
+				self._stamp_mtime = stamp
+			return self._data
+
+	# mtime of the stamp file behind the current snapshot - unlike version it is
+	# the same in every worker, so it can go into HTTP validators
+	@property
+	def stamp(self):
+		self.get()
+		return self._stamp_mtime
+
+	# drop this process's snapshot; the next get() reloads
+	def invalidate(self):
+		with self._lock:
+			self._data = None
+
+	# drop every worker's snapshot by touching the shared stamp file
+	def invalidate_all(self):
+		self.invalidate()
+		if self.stamp_file:
+			stamp_dir = os.path.dirname(self.stamp_file)
+			if stamp_dir and not os.path.isdir(stamp_dir):
+				os.makedirs(stamp_dir)
+			with open(self.stamp_file, 'a'):
+				os.utime(self.stamp_file, None)
@@ -0,0 +1,89 @@
+import re
+from sqlalchemy import text
+
+# Full-text search over the indexes created by migration b7d21c4e9f03.
+# SQLite: positions_fts indexes positions.name/description and devs_fts
+# indexes devs.first_name/last_name/profile_bio, ranked with bm25().
+# PostgreSQL: a generated search_vector column on each table with a GIN
+# index, ranked with ts_rank().  Neither is in the models.
+
+FTS_TABLES = ('positions_fts', 'devs_fts')
+SEARCH_VECTOR = 'search_vector'
+TOKEN_REGEX = re.compile(r'\w+', re.UNICODE)
+
+# bm25 column weights - a hit in a title or name beats one in the body text
+POSITION_QUERY = text("""
+	SELECT positions.id, positions.name, positions.org,
+		snippet(positions_fts, 1, '', '', '...', 24) AS excerpt
+	FROM positions_fts JOIN positions ON positions.id = positions_fts.rowid
+	WHERE positions_fts MATCH :match AND positions.status = 'open'
+	ORDER BY bm25(positions_fts, 10.0, 1.0)
+	LIMIT :limit OFFSET :offset""")
+
+DEV_QUERY = text("""
+	SELECT devs.id, devs.first_name, devs.last_name,
+		snippet(devs_fts, 2, '', '', '...', 24) AS excerpt
+	FROM devs_fts JOIN devs ON devs.id = devs_fts.rowid
+	WHERE devs_fts MATCH :match
+	ORDER BY bm25(devs_fts, 5.0, 5.0, 1.0)
+	LIMIT :limit OFFSET :offset""")
+
+# ts_rank's default weights put 'A' (titles, names) at 10x 'D' (body text)
+PG_POSITION_QUERY = text("""
+	SELECT positions.id, positions.name, positions.org,
+		ts_headline('english', positions.description, query, 'StartSel="", StopSel="", MaxWords=24, MinWords=12') AS excerpt
+	FROM positions, to_tsquery('english', :match) AS query
+	WHERE positions.search_vector @@ query AND positions.status = 'open'
+	ORDER BY ts_rank(positions.search_vector, query) DESC
+	LIMIT :limit OFFSET :offset""")
+
+PG_DEV_QUERY = text("""
+	SELECT devs.id, devs.first_name, devs.last_name,
+		ts_headline('english', coalesce(devs.profile_bio, ''), query, 'StartSel="", StopSel="", MaxWords=24, MinWords=12') AS excerpt
+	FROM devs, to_tsquery('english', :match) AS query
+	WHERE devs.search_vector @@ query
+	ORDER BY ts_rank(devs.search_vector, query) DESC
+	LIMIT :limit OFFSET :offset""")
+
+
+# Alembic autogenerate must not try to drop the virtual tables, their shadow tables or the tsvector columns
+def include_object(obj, name, type_, reflected, compare_to):
+	if type_ == 'table' and name.startswith(FTS_TABLES):
+		return False
+	if type_ in ('column', 'index') and name and name.endswith(SEARCH_VECTOR):
+		return False
+	return True
+
+
+# turn free text into a safe FTS5 expression: every word quoted, prefix-matched, ANDed
+def to_match_expression(query):
+	tokens = TOKEN_REGEX.findall(query or '')
+	return ' '.join('"%s"*' % token for token in tokens[:16])
+
+
+# the same for to_tsquery: word:* & word:*
+def to_tsquery_expression(query):
+	tokens = TOKEN_REGEX.findall(query or '')
+	return ' & '.join('%s:*' % token for token in tokens[:16])
+
+
+# dialect -> (match expression builder, {kind: query})
+DIALECTS = {
+	'sqlite': (to_match_expression, {'positions': POSITION_QUERY, 'devs': DEV_QUERY}),
+	'postgresql': (to_tsquery_expression, {'positions': PG_POSITION_QUERY, 'devs': PG_DEV_QUERY}),
+}
+
+
+# returns (rows, has_next) for 1-based page numbers
+def search(session, kind, query, page=1, per_page=20):
+	dialect = session.get_bind().dialect.name
+	if dialect not in DIALECTS:
+		raise RuntimeError("full-text search is not available on %s" % dialect)
+	to_expression, queries = DIALECTS[dialect]
+	match = to_expression(query)
+	if not match:
+		return [], False
+
+	statement = queries['positions' if kind == 'positions' else 'devs']
+	rows = session.execute(statement, {'match': match, 'limit': per_page + 1, 'offset': (page - 1) * per_page}).fetchall()
+	return rows[:per_page], len(rows) > per_page
@@ -0,0 +1,128 @@
+import json
+import random
+import time
+
+# Synthetic data for load testing - see 'flask seed' in cli.py.
+# Rows go in with explicit ids through executemany, a chunk per transaction,
+# so a few hundred thousand devs take seconds rather than hours.  Every seeded
+# account shares one password so the load harness can log in as any of them.
+
+FIRST_NAMES = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William', 'Elizabeth',
+	'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Charles', 'Karen', 'Daniel',
+	'Nancy', 'Matthew', 'Lisa', 'Anthony', 'Betty', 'Mark', 'Sandra', 'Steven', 'Ashley', 'Andrew', 'Kimberly']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+	'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin', 'Lee',
+	'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Ramirez', 'Lewis', 'Robinson', 'Walker', 'Young']
+CITIES = ['Seattle', 'Bellevue', 'Redmond', 'Portland', 'San Francisco', 'San Jose', 'Los Angeles', 'Austin', 'Dallas',
+	'Denver', 'Chicago', 'Boston', 'New York', 'Atlanta', 'Miami', 'Phoenix', 'Salt Lake City', 'Minneapolis']
+JOB_TITLES = ['Software Engineer', 'Frontend Developer', 'Backend Developer', 'Full Stack Developer', 'Data Engineer',
+	'Mobile Developer', 'DevOps Engineer', 'QA Engineer', 'Web Developer', 'Platform Engineer']
+LEVELS = ['Junior', '', 'Senior', 'Lead', 'Staff']
+WORDS = ('build ship maintain scale design review test deploy debug mentor api service database frontend backend '
+	'cloud product team customer feature performance reliability security code data pipeline mobile web').split()
+
+CHUNK_SIZE = 5000
+
+
+# a few skills are very popular and most are niche - roughly Zipf shaped
+def zipf_weights(count, rng):
+	ranks = list(range(1, count + 1))
+	rng.shuffle(ranks)
+	return [1.0 / rank for rank in ranks]
+
+
+def pick_distinct(rng, population, weights, count):
+	picked = set()
+	while len(picked) < min(count, len(population)):
+		picked.add(rng.choices(population, weights)[0])
+	return picked
+
+
+def sentence(rng, low, high):
+	return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + '.'
+
+
+def insert_chunked(session, table, rows):
+	chunk = []
+	for row in rows:
+		chunk.append(row)
+		if len(chunk) >= CHUNK_SIZE:
+			session.execute(table.insert(), chunk)
+			session.commit()
+			chunk = []
+	if chunk:
+		session.execute(table.insert(), chunk)
+		session.commit()
+
+
+def next_id(session, table):
+	return (session.execute(table.select().with_only_columns(table.c.id).order_by(table.c.id.desc()).limit(1)).scalar() or 0) + 1
+
+
+def seed_database(session, tables, dev_count, org_count, pos_count, pw_hash, seed=None, echo=print):
+	rng = random.Random(seed)
+	lang_ids = [row[0] for row in session.execute(tables['langs'].select().with_only_columns(tables['langs'].c.id))]
+	frame_lib_ids = [row[0] for row in session.execute(tables['framelib'].select().with_only_columns(tables['framelib'].c.id))]
+	state_ids = [row[0] for row in session.execute(tables['states'].select().with_only_columns(tables['states'].c.id))]
+	lang_weights = zipf_weights(len(lang_ids), rng)
+	frame_lib_weights = zipf_weights(len(frame_lib_ids), rng)
+	state_weights = zipf_weights(len(state_ids), rng)
+
+	first_dev = next_id(session, tables['devs'])
+	first_org = next_id(session, tables['orgs'])
+	# archived positions keep their ids, so new ones start past both tables
+	first_pos = max(next_id(session, tables['positions']), next_id(session, tables['positions_archive']))
+	dev_ids = range(first_dev, first_dev + dev_count)
+	org_ids = range(first_org, first_org + org_count)
+	pos_ids = range(first_pos, first_pos + pos_count)
+
+	start = time.time()
+	insert_chunked(session, tables['devs'], ({
+		'id': dev_id, 'first_name': rng.choice(FIRST_NAMES), 'last_name': rng.choice(LAST_NAMES),
+		'email': 'seed.dev.%d@example.com' % dev_id, 'password': pw_hash,
+		'address': '%d Main St' % rng.randint(1, 9999), 'address_2': '', 'address_city': rng.choice(CITIES),
+		'address_state': rng.choices(state_ids, state_weights)[0], 'profile_bio': sentence(rng, 8, 40), 'status': 1,
+	} for dev_id in dev_ids))
+	echo("devs: %d" % dev_count)
+
+	insert_chunked(session, tables['dev_langs'], ({'dev_id': dev_id, 'lang_id': lang_id}
+		for dev_id in dev_ids for lang_id in pick_distinct(rng, lang_ids, lang_weights, rng.randint(1, 5))))
+	insert_chunked(session, tables['dev_frame_lib'], ({'dev_id': dev_id, 'framelib_id': frame_lib_id}
+		for dev_id in dev_ids for frame_lib_id in pick_distinct(rng, frame_lib_ids, frame_lib_weights, rng.randint(0, 5))))
+	echo("dev skills done")
+
+	insert_chunked(session, tables['orgs'], ({
+		'id': org_id, 'org_name': '%s %s' % (rng.choice(LAST_NAMES), rng.choice(['Labs', 'Software', 'Systems', 'Digital', 'Inc'])),
+		'rep_name': '%s %s' % (rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)),
+		'email': 'seed.org.%d@example.com' % org_id, 'password': pw_hash,
+		'address': '%d Market St' % rng.randint(1, 9999), 'address_2': '', 'address_city': rng.choice(CITIES),
+		'address_state': str(rng.choices(state_ids, state_weights)[0]),
+	} for org_id in org_ids))
+	echo("orgs: %d" % org_count)
+
+	if org_count and pos_count:
+		insert_chunked(session, tables['positions'], ({
+			'id': pos_id, 'org': rng.choice(org_ids), 'name': ('%s %s' % (rng.choice(LEVELS), rng.choice(JOB_TITLES))).strip(),
+			'description': sentence(rng, 20, 80),
+		} for pos_id in pos_ids))
+		insert_chunked(session, tables['position_langs'], ({'pos_id': pos_id, 'lang_id': lang_id}
+			for pos_id in pos_ids for lang_id in pick_distinct(rng, lang_ids, lang_weights, rng.randint(1, 4))))
+		insert_chunked(session, tables['position_frame_lib'], ({'pos_id': pos_id, 'framelib_id': frame_lib_id}
+			for pos_id in pos_ids for frame_lib_id in pick_distinct(rng, frame_lib_ids, frame_lib_weights, rng.randint(0, 3))))
+		echo("positions: %d" % pos_count)
+
+	echo("seeded in %.1fs" % (time.time() - start))
+
+	# what the load harness needs to find its users and pages
+	return {
+		'dev_ids': [first_dev, first_dev + dev_count - 1],
+		'org_ids': [first_org, first_org + org_count - 1],
+		'pos_ids': [first_pos, first_pos + pos_count - 1] if org_count and pos_count else [],
+		'dev_email': 'seed.dev.%d@example.com',
+		'org_email': 'seed.org.%d@example.com',
+	}
+
+
+def write_manifest(path, manifest):
+	with open(path, 'w') as manifest_file:
+		json.dump(manifest, manifest_file, indent=2)
@@ -0,0 +1,126 @@
+import hmac
+from datetime import datetime
+
+from flask import Blueprint, current_app, render_template, redirect, request, session, abort, Response, stream_with_context
+
+import export
+import geo
+import position_archive
+import search
+from extensions import refdata, metrics
+from models import db, Dev, Org, Position, dev_lang_table, pos_lang_table, dev_frame_lib_table, pos_frame_lib_table
+from view_helpers import job_cards, dev_cards
+
+site = Blueprint('site', __name__)
+
+
+#############
+## METRICS ##
+#############
+@site.route('/metrics')
+def metrics_page():
+	if not metrics.enabled:
+		abort(404)
+
+	return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+################
+## EXPORT API ##
+################
+EXPORT_SPECS = {
+	'devs': export.ExportSpec(Dev.__table__,
+		['id', 'first_name', 'last_name', 'email', 'address_city', 'address_state', 'profile_bio', 'date_created', 'date_updated'],
+		[('languages', dev_lang_table, 'dev_id', 'lang_id', 'langs_by_id'), ('frameworks', dev_frame_lib_table, 'dev_id', 'framelib_id', 'frame_libs_by_id')],
+		{'state': lambda row, ref: ref.state(row.address_state).abbrev if ref.state(row.address_state) else None}),
+	'positions': export.ExportSpec(Position.__table__,
+		['id', 'org', 'name', 'description', 'status', 'expires_at', 'date_created', 'date_updated'],
+		[('languages', pos_lang_table, 'pos_id', 'lang_id', 'langs_by_id'), ('frameworks', pos_frame_lib_table, 'pos_id', 'framelib_id', 'frame_libs_by_id')]),
+}
+
+@site.route('/api/export/<kind>')
+def api_export(kind):
+	token = current_app.config['EXPORT_API_TOKEN']
+	# constant-time compare, so response timing doesn't leak how much of the token matched; bytes, since a non-ASCII str raises
+	has_token = token and hmac.compare_digest(request.headers.get('Authorization', '').encode('utf-8'), ('Bearer ' + token).encode('utf-8'))
+	if not has_token and session.get('acct_type') != 'org':
+		return Response("Unauthorized\n", 401, mimetype='text/plain')
+
+	if kind not in EXPORT_SPECS:
+		abort(404)
+	fmt = request.args.get('format', 'ndjson')
+	if fmt not in export.FORMATS:
+		return Response("format must be ndjson or csv\n", 400, mimetype='text/plain')
+
+	updated_since = None
+	if request.args.get('updated_since'):
+		try:
+			updated_since = datetime.fromisoformat(request.args['updated_since'])
+		except ValueError:
+			return Response("updated_since must be an ISO 8601 timestamp\n", 400, mimetype='text/plain')
+
+	spec = EXPORT_SPECS[kind]
+	records = export.iter_records(db.session, spec, refdata.get(), updated_since, current_app.config['EXPORT_BATCH_SIZE'])
+	body = export.to_ndjson(records) if fmt == 'ndjson' else export.to_csv(records, spec.fields)
+
+	response = Response(stream_with_context(export.buffered(body)), mimetype=export.FORMATS[fmt])
+	response.headers['Content-Disposition'] = 'attachment; filename=%s.%s' % (kind, fmt)
+	return response
+
+
+############
+## SEARCH ##
+############
+@site.route('/search')
+def search_page():
+	if 'userid' not in session:
+		return redirect('/')
+
+	# devs look for jobs and orgs look for devs unless they ask otherwise
+	kind = request.args.get('type')
+	if kind not in ('positions', 'devs'):
+		kind = 'positions' if session['acct_type'] == 'dev' else 'devs'
+	query = request.args.get('q', '').strip()
+	page = max(request.args.get('page', 1, type=int), 1)
+
+	results, has_next = search.search(db.session, kind, query, page, current_app.config['SEARCH_PAGE_SIZE'])
+
+	return render_template('search.html', query=query, kind=kind, page=page, has_next=has_next, results=results)
+
+
+############
+## NEARBY ##
+############
+@site.route('/nearby')
+def nearby_page():
+	if 'userid' not in session:
+		return redirect('/')
+
+	miles = request.args.get('miles', 50, type=int)
+	if miles not in current_app.config['NEARBY_MILES']:
+		miles = 50
+	limit = current_app.config['NEARBY_LIMIT']
+
+	# devs see postings from orgs near them, orgs see devs near them
+	if session['acct_type'] == 'dev':
+		cur_user = Dev.query.get(session['userid'])
+	else:
+		cur_user = Org.query.get(session['userid'])
+
+	results = []
+	if cur_user.geo_cell is not None:
+		if session['acct_type'] == 'dev':
+			org_miles = dict(geo.nearby(db.session, Org.__table__, cur_user.lat, cur_user.lon, miles))
+			if org_miles:
+				jobs = db.session.query(Position.id, Position.org, Position.date_updated).filter(Position.org.in_(list(org_miles)), Position.status == position_archive.OPEN).all()
+				jobs.sort(key=lambda job: (org_miles[job.org], -job.id))
+				jobs = jobs[:limit]
+				results = list(zip(job_cards([(job.id, job.date_updated) for job in jobs]), [org_miles[job.org] for job in jobs]))
+		else:
+			found = geo.nearby(db.session, Dev.__table__, cur_user.lat, cur_user.lon, miles, limit)
+			if found:
+				stamps = dict(db.session.query(Dev.id, Dev.date_updated).filter(Dev.id.in_([dev_id for dev_id, distance in found])))
+				found = [(dev_id, distance) for dev_id, distance in found if dev_id in stamps]
+				results = list(zip(dev_cards([(dev_id, stamps[dev_id]) for dev_id, distance in found]), [distance for dev_id, distance in found]))
+
+	return render_template('nearby.html', miles=miles, miles_choices=current_app.config['NEARBY_MILES'], located=cur_user.geo_cell is not None, results=results)
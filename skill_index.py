@@ -0,0 +1,200 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import select, func
+
+import facets
+import job_queue
+
+# Read-only snapshot of the devs' skill and state facets in one binary file
+# that every worker maps with mmap, so the OS page cache holds a single copy for
+# the whole host instead of one per process.
+#
+# Each section maps a key (language, framework or state id) to a bitmap of
+# dev ids (bit N = dev N), stored as little-endian bytes in the same layout
+# as facets.FacetIndex's ints:
+#
+#   header     MAGIC, format version, section count, meta length
+#   meta       JSON: generation, built_at, devs watermark (see facets.sync)
+#   sections   (name, entry count, directory offset) per section
+#   directory  (key, popcount, offset, length) per key, sorted by key
+#   bitmaps    8-byte aligned
+#
+# build() writes a new generation beside the live file and os.replace()s it
+# in, which is atomic; readers holding the old mapping keep the old inode
+# until they let go.  SkillIndex.current() notices the swap with one stat()
+# and maps the new generation, so no restart is needed.  Rebuilds are queued
+# as a job after dev skill writes (request_rebuild) and run by 'flask worker'.
+# Only the orgs dashboard facets read it, so it holds dev sections only;
+# position matching goes through match_table.
+
+MAGIC = b'DODSKIX\x00'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIII')
+SECTION = struct.Struct('<32sIQ')
+ENTRY = struct.Struct('<IIQQ')
+
+REBUILD_JOB = 'rebuild_skill_index'
+
+
+def _align(offset):
+	return (offset + 7) & ~7
+
+
+class Generation(object):
+
+	def __init__(self, path):
+		with open(path, 'rb') as source:
+			self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+		self._view = memoryview(self._map)
+		magic, version, section_count, meta_len = HEADER.unpack_from(self._view, 0)
+		if magic != MAGIC or version != FORMAT_VERSION:
+			raise ValueError("%s is not a version %d skill index" % (path, FORMAT_VERSION))
+		meta = json.loads(bytes(self._view[HEADER.size:HEADER.size + meta_len]).decode('utf-8'))
+		self.generation = meta['generation']
+		self.built_at = meta['built_at']
+		newest, ties = meta['watermark']
+		self.watermark = (datetime.fromisoformat(newest) if newest else None, ties)
+
+		self.sections = {}		# name -> {key: (count, offset, length)}
+		position = _align(HEADER.size + meta_len)
+		for _ in range(section_count):
+			name, entry_count, directory = SECTION.unpack_from(self._view, position)
+			position += SECTION.size
+			entries = {}
+			for index in range(entry_count):
+				key, count, offset, length = ENTRY.unpack_from(self._view, directory + index * ENTRY.size)
+				entries[key] = (count, offset, length)
+			self.sections[name.rstrip(b'\x00').decode('ascii')] = entries
+
+	def keys(self, section):
+		return self.sections.get(section, {}).keys()
+
+	def count(self, section, key):
+		entry = self.sections.get(section, {}).get(key)
+		return entry[0] if entry else 0
+
+	# the bitmap as a Python int, read straight out of the mapping
+	def bitmap(self, section, key):
+		entry = self.sections.get(section, {}).get(key)
+		if entry is None:
+			return 0
+		return int.from_bytes(self._view[entry[1]:entry[1] + entry[2]], 'little')
+
+
+class SkillIndex(object):
+
+	def __init__(self, path):
+		self.path = path
+		self._lock = threading.Lock()
+		self._current = None
+		self._stat = None
+		self.loads = 0
+
+	# the newest generation on disk, or None when no index has been built yet
+	def current(self):
+		try:
+			st = os.stat(self.path)
+		except OSError:
+			return None
+		stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+		if stat == self._stat:
+			return self._current
+		with self._lock:
+			if stat != self._stat:
+				try:
+					self._current = Generation(self.path)
+				except (OSError, ValueError):
+					return self._current
+				self._stat = stat
+				self.loads += 1
+			return self._current
+
+
+def snapshot(session, tables):
+	devs = tables['devs']
+	# the watermark is read before the rows, so anything sync() reads after it is at least as new
+	newest = session.execute(select(func.max(devs.c.date_updated))).scalar()
+	ties = session.execute(select(func.count()).select_from(devs).where(devs.c.date_updated == newest)).scalar() if newest is not None else 0
+
+	sections = dict((section, {}) for section in facets.BASE_SECTIONS.values())
+	all_section, all_key = facets.BASE_ALL_DEVS
+	sections[all_section] = {all_key: 0}
+	for dev_id, values in facets.devs_facet_values(session, tables).items():
+		bit = 1 << dev_id
+		sections[all_section][all_key] |= bit
+		for facet, section in facets.BASE_SECTIONS.items():
+			for key in values[facet]:
+				sections[section][key] = sections[section].get(key, 0) | bit
+	return sections, (newest.isoformat() if newest is not None else None, ties)
+
+
+def write(path, sections, meta):
+	meta = json.dumps(meta).encode('utf-8')
+	position = _align(HEADER.size + len(meta))
+	section_table = position
+	position = _align(position + SECTION.size * len(sections))
+	directories = {}
+	for name in sorted(sections):
+		directories[name] = position
+		position = _align(position + ENTRY.size * len(sections[name]))
+
+	temp_path = '%s.%d.tmp' % (path, os.getpid())
+	with open(temp_path, 'wb') as out:
+		out.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), len(meta)) + meta)
+		out.seek(section_table)
+		for name in sorted(sections):
+			out.write(SECTION.pack(name.encode('ascii'), len(sections[name]), directories[name]))
+		for name in sorted(sections):
+			entries = []
+			for key in sorted(sections[name]):
+				bits = sections[name][key]
+				data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+				entries.append((key, facets.popcount(bits), position, data))
+				position = _align(position + len(data))
+			out.seek(directories[name])
+			for key, count, offset, data in entries:
+				out.write(ENTRY.pack(key, count, offset, len(data)))
+			for key, count, offset, data in entries:
+				out.seek(offset)
+				out.write(data)
+		out.truncate(max(position, out.tell()))
+		out.flush()
+		os.fsync(out.fileno())
+	os.replace(temp_path, path)
+
+
+def generation_on_disk(path):
+	try:
+		return Generation(path).generation
+	except (OSError, ValueError):
+		return 0
+
+
+# writes the next generation and returns it
+def build(session, tables, path, echo=None):
+	started = time.perf_counter()
+	directory = os.path.dirname(path)
+	if directory and not os.path.isdir(directory):
+		os.makedirs(directory)
+	sections, watermark = snapshot(session, tables)
+	session.commit()
+	generation = generation_on_disk(path) + 1
+	write(path, sections, {'generation': generation, 'built_at': time.time(), 'watermark': watermark})
+	if echo:
+		echo("skill index generation %d: %d bytes, %d keys in %.2fs" % (generation, os.path.getsize(path),
+			sum(len(entries) for entries in sections.values()), time.perf_counter() - started))
+	return generation
+
+
+# after a dev skill write, in the writer's transaction: queue one rebuild unless one is already waiting
+def request_rebuild(session, tables, delay=0):
+	jobs = tables['jobs']
+	waiting = session.execute(select(jobs.c.id).where(jobs.c.kind == REBUILD_JOB).where(jobs.c.status == job_queue.QUEUED).limit(1)).first()
+	if waiting is None:
+		job_queue.enqueue(session, tables, REBUILD_JOB, {}, delay=delay)
@@ -0,0 +1,44 @@
+from datetime import datetime
+from sqlalchemy import select
+
+# Set-based writes for the skill association tables (dev_langs, dev_frame_lib,
+# position_langs, position_frame_lib).  Instead of clearing a relationship and
+# re-appending it row by row, the submitted ids are resolved in one query,
+# diffed against the rows already there, and only the difference is written.
+# Nothing here commits - the caller commits once so the whole change is one
+# transaction (and one write lock on the SQLite file).
+# When owner_table is given, a real change also bumps the owner's
+# date_updated, since caches and validators key on that column.
+
+
+def parse_ids(raw_ids):
+	ids = set()
+	for raw_id in raw_ids:
+		try:
+			ids.add(int(raw_id))
+		except (TypeError, ValueError):
+			pass
+	return ids
+
+
+# returns the sorted list of skill ids the owner ends up with
+def sync_skills(session, assoc_table, owner_col, owner_id, skill_col, skill_table, submitted_ids, owner_table=None):
+	owner = assoc_table.c[owner_col]
+	skill = assoc_table.c[skill_col]
+
+	wanted = parse_ids(submitted_ids)
+	if wanted:
+		wanted = set(row[0] for row in session.execute(select(skill_table.c.id).where(skill_table.c.id.in_(wanted))))
+
+	current = set(row[0] for row in session.execute(select(skill).where(owner == owner_id)))
+
+	to_delete = current - wanted
+	to_insert = wanted - current
+	if to_delete:
+		session.execute(assoc_table.delete().where(owner == owner_id).where(skill.in_(to_delete)))
+	if to_insert:
+		session.execute(assoc_table.insert(), [{owner_col: owner_id, skill_col: skill_id} for skill_id in sorted(to_insert)])
+	if owner_table is not None and (to_delete or to_insert):
+		session.execute(owner_table.update().where(owner_table.c.id == owner_id).values(date_updated=datetime.utcnow()))
+
+	return sorted(wanted)
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db
+
+
+# a throwaway SQLite file with the app's tables; helper modules take (session, tables)
+@pytest.fixture
+def session(tmp_path):
+	engine = create_engine('sqlite:///' + str(tmp_path / 'test.db'))
+	db.metadata.create_all(engine)
+	session = Session(engine)
+	yield session
+	session.close()
+	engine.dispose()
+
+
+@pytest.fixture
+def tables():
+	return db.metadata.tables
@@ -0,0 +1,29 @@
+import pytest
+
+from rate_limit import RateLimiter
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+	monkeypatch.setenv('DATABASE_URL', 'sqlite:///' + str(tmp_path / 'app.db'))
+	monkeypatch.setenv('JINJA_CACHE_DIR', str(tmp_path / 'jinja_cache'))
+	monkeypatch.setenv('PROXY_FIX_X_FOR', '1')
+	from app import create_app
+	from models import db
+	app = create_app()
+	app.config['LOGIN_LIMIT_PER_IP'] = (1, 60)
+	app.extensions['devs_on_deck']['limiter'] = RateLimiter(str(tmp_path / 'rate_limits.db'))
+	with app.app_context():
+		db.create_all()
+	return app.test_client()
+
+
+def login(client, forwarded_for, email):
+	return client.post('/devs/validate/login', data={'email': email, 'password': 'Passw0rd'}, headers={'X-Forwarded-For': forwarded_for})
+
+
+def test_forwarded_clients_get_separate_buckets(client):
+	assert login(client, '203.0.113.1', 'a@example.com').status_code == 302
+	assert login(client, '203.0.113.1', 'b@example.com').status_code == 429
+	# same proxy socket address, different client behind it
+	assert login(client, '198.51.100.7', 'c@example.com').status_code == 302
@@ -0,0 +1,35 @@
+import base64
+import os
+
+import assets
+
+# a 1x1 transparent PNG
+ICON = base64.b64decode('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==')
+
+
+def make_static(static_dir, css):
+	for name in ('icons', 'css', 'js'):
+		os.makedirs(os.path.join(static_dir, name), exist_ok=True)
+	with open(os.path.join(static_dir, 'icons', 'python_icon.png'), 'wb') as out:
+		out.write(ICON)
+	with open(os.path.join(static_dir, 'css', 'main.css'), 'w') as out:
+		out.write(css)
+	with open(os.path.join(static_dir, 'js', 'app.js'), 'w') as out:
+		out.write('var answer = 42;\n')
+
+
+def test_rebuild_keeps_old_files_until_pruned(tmp_path):
+	static_dir = str(tmp_path)
+	make_static(static_dir, 'body { color: red; }')
+	old = assets.build(static_dir, echo=lambda message: None)['files']['css/main.css']
+
+	make_static(static_dir, 'body { color: blue; }')
+	manifest = assets.build(static_dir, echo=lambda message: None)
+	new = manifest['files']['css/main.css']
+	assert new != old
+	assert os.path.exists(os.path.join(static_dir, old))
+	assert assets.load_manifest(static_dir) == manifest
+
+	assert assets.prune(static_dir, echo=lambda message: None) == 1
+	assert not os.path.exists(os.path.join(static_dir, old))
+	assert all(os.path.exists(os.path.join(static_dir, path)) for path in manifest['files'].values())
@@ -0,0 +1,12 @@
+from fragment_cache import FragmentCache
+
+
+def test_budget_counts_utf8_bytes():
+	cache = FragmentCache(max_bytes=10)
+	cache.put('ascii', 'abcd')
+	# four characters, eight bytes: together they pass the cap, so the older entry goes
+	cache.put('accented', 'éèêë')
+	assert cache.size == 8
+	assert cache.get('ascii') is None
+	assert cache.get('accented') == 'éèêë'
+	assert cache.evictions == 1
@@ -0,0 +1,15 @@
+import job_queue
+
+
+def test_job_that_keeps_losing_its_worker_stops_at_max_attempts(session, tables):
+	job_queue.enqueue(session, tables, 'notify_matches', {'pos_id': 1}, max_attempts=2)
+	session.commit()
+
+	# a negative visibility timeout leaves each lock already lapsed, as if the worker had been killed
+	assert job_queue.claim(session, tables, 'worker:1', -1).attempts == 1
+	assert job_queue.claim(session, tables, 'worker:2', -1).attempts == 2
+	assert job_queue.claim(session, tables, 'worker:3', -1) is None
+
+	job = session.execute(tables['jobs'].select()).one()
+	assert (job.status, job.attempts) == (job_queue.FAILED, 2)
+	assert 'lost' in job.last_error
@@ -0,0 +1,27 @@
+import position_archive
+
+
+def create_position(session, tables, org_id, name):
+	result = session.execute(tables['positions'].insert().values(org=org_id, name=name, description='A job description'))
+	session.commit()
+	return result.inserted_primary_key[0]
+
+
+def test_compacted_ids_are_not_reused(session, tables):
+	session.execute(tables['orgs'].insert().values(id=1, org_name='Acme', email='acme@example.com', password='x'))
+	session.commit()
+	create_position(session, tables, 1, 'First')
+	filled = create_position(session, tables, 1, 'Second')
+
+	position_archive.close_positions(session, tables, [filled], position_archive.FILLED)
+	session.commit()
+	assert position_archive.compact(session, tables) == 1
+
+	reposted = create_position(session, tables, 1, 'Third')
+	assert reposted > filled
+
+	position_archive.close_positions(session, tables, [reposted], position_archive.FILLED)
+	session.commit()
+	assert position_archive.compact(session, tables) == 1
+	archived = session.execute(tables['positions_archive'].select().order_by(tables['positions_archive'].c.id)).fetchall()
+	assert [(row.id, row.name) for row in archived] == [(filled, 'Second'), (reposted, 'Third')]
@@ -0,0 +1,35 @@
+import json
+from types import SimpleNamespace
+
+from org_views import validate_position
+from position_import import import_positions
+
+REFDATA = SimpleNamespace(langs=[SimpleNamespace(id=1, name='Python')], frame_libs=[SimpleNamespace(id=1, name='Flask')])
+DESCRIPTION = 'Build and run our web services'
+
+
+def write_lines(path, rows):
+	with open(path, 'w') as out:
+		for row in rows:
+			out.write(json.dumps(row) + '\n')
+	return str(path)
+
+
+def test_non_string_fields_are_reported_per_row(session, tables, tmp_path):
+	path = write_lines(tmp_path / 'positions.jsonl', [
+		{'name': 'Backend developer', 'description': DESCRIPTION, 'languages': ['Python']},
+		{'name': 5, 'description': DESCRIPTION},
+		{'name': 'Data engineer', 'description': ['not', 'text']},
+		{'name': 'Web developer', 'description': DESCRIPTION, 'frameworks': [1, 2]},
+		{'name': 'Platform engineer', 'description': DESCRIPTION, 'languages': 'Python', 'frameworks': ['Flask']},
+	])
+	report = import_positions(session, tables, path, 1, validate_position, REFDATA, chunk_size=3)
+
+	assert report.imported == 2
+	assert [line_no for line_no, message in report.errors] == [2, 3, 4]
+	assert 'name must be text, not int' in report.errors[0][1]
+	assert 'description must be text, not list' in report.errors[1][1]
+	assert 'frameworks must be a list of names' in report.errors[2][1]
+	positions = tables['positions']
+	names = session.execute(positions.select().with_only_columns(positions.c.name).order_by(positions.c.id)).scalars().all()
+	assert names == ['Backend developer', 'Platform engineer']
@@ -0,0 +1,98 @@
+import hashlib
+from datetime import datetime
+
+from flask import current_app, render_template, request, session, Response, stream_template
+from markupsafe import Markup
+from sqlalchemy.orm import selectinload, load_only
+
+import compression
+import facets
+from extensions import refdata, fragments, gazetteer, facet_index, asset_manifest
+from models import db, Dev, Position
+
+# Helpers shared by the dev, org, auth and site blueprints.
+
+# devs store a state id, orgs a string that is normally the id too but may be a name or abbreviation
+def state_abbrev(state_value):
+	states = refdata.get()
+	value = str(state_value or '').strip()
+	if value.isdigit():
+		state = states.state(int(value))
+		return state.abbrev if state else None
+	for state in states.states:
+		if value.lower() in (state.abbrev.lower(), state.name.lower()):
+			return state.abbrev
+	return None
+
+# fills lat/lon/geo_cell on a Dev or Org from its city and state
+def set_location(account):
+	account.lat, account.lon, account.geo_cell = gazetteer.locate(account.address_city, state_abbrev(account.address_state))
+
+
+# stamps are (pos_id, date_updated) pairs in display order; only cache misses touch the ORM
+def job_cards(stamps):
+	version = refdata.get().version
+	def render_missing(keys):
+		jobs = Position.query.options(selectinload(Position.pos_skills_langs)).filter(Position.id.in_([key[1] for key in keys]))
+		jobs_by_id = dict((job.id, job) for job in jobs)
+		return dict((key, Markup(render_template('_job_card.html', cur_job=jobs_by_id[key[1]]))) for key in keys if key[1] in jobs_by_id)
+	return fragments.get_many([('job', pos_id, updated, version) for pos_id, updated in stamps], render_missing)
+
+def dev_cards(stamps):
+	version = refdata.get().version
+	def render_missing(keys):
+		devs = Dev.query.options(load_only(Dev.id, Dev.first_name, Dev.last_name, Dev.profile_bio), selectinload(Dev.devs_skills_langs)).filter(Dev.id.in_([key[1] for key in keys]))
+		devs_by_id = dict((dev.id, dev) for dev in devs)
+		return dict((key, Markup(render_template('_dev_card.html', cur_dev=devs_by_id[key[1]]))) for key in keys if key[1] in devs_by_id)
+	return fragments.get_many([('dev', dev_id, updated, version) for dev_id, updated in stamps], render_missing)
+
+
+# cards rendered batch by batch as the template pulls them; the leading empty
+# chunk makes stream_page flush the head and nav before any card work starts
+def lazy_cards(render, stamps_fn):
+	yield Markup('')
+	stamps = stamps_fn()
+	batch_size = current_app.config['CARD_BATCH_SIZE']
+	for start in range(0, len(stamps), batch_size):
+		for card in render(stamps[start:start + batch_size]):
+			yield card
+
+def stream_page(template_name, **context):
+	if not current_app.config['STREAM_PAGES']:
+		return render_template(template_name, **context)
+	return Response(compression.coalesce(stream_template(template_name, **context)), mimetype='text/html')
+
+def refresh_dev_facets(dev_id):
+	facets.update_devs(db.session, db.metadata.tables, facet_index, [dev_id])
+
+
+# conditional GET for pages built from a few date_updated columns.
+# The ETag covers every timestamp the page depends on plus the viewer (the nav
+# differs per role/account), the shared refdata stamp and the templates'
+# mtime, so a deploy or a lookup-table change also invalidates it.
+def page_validators(*timestamps):
+	templates_stamp = current_app.extensions['devs_on_deck']['templates_stamp']
+	parts = [session.get('acct_type'), session.get('userid'), refdata.stamp, templates_stamp, asset_manifest['files'].get('css/main.css')] + list(timestamps)
+	etag = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:20]
+	known = [stamp for stamp in timestamps if isinstance(stamp, datetime)] + [datetime.utcfromtimestamp(templates_stamp)]
+	return etag, max(known).replace(microsecond=0)
+
+# a bare 304 when the browser's copy is current, else None and the caller renders
+def not_modified(etag, last_modified):
+	if request.if_none_match:
+		# weak match: compression turns the ETag weak (see compression.py)
+		current = request.if_none_match.contains_weak(etag)
+	else:
+		current = last_modified is not None and request.if_modified_since is not None and request.if_modified_since.replace(tzinfo=None) >= last_modified
+	if not current:
+		return None
+	return conditional_headers(Response(status=304), etag, last_modified)
+
+def conditional_headers(response, etag, last_modified):
+	response.set_etag(etag)
+	if last_modified is not None:
+		response.last_modified = last_modified
+	# per-viewer page: browsers may keep it but must revalidate every time
+	response.cache_control.private = True
+	response.cache_control.no_cache = True
+	return response